@@ -8,12 +8,20 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-import pandas as pd
-from lib_chat_bot.catalog.models import Book
-from lib_chat_bot.catalog.search_engine import score_book, fuzzy_score_author, fuzzy_score_title, rerank_books
+from lib_chat_bot.catalog.shared_index import load_shared_index
+from lib_chat_bot.catalog.search_engine import (
+    score_book,
+    rerank_books,
+    normalize,
+    significant_words,
+    fuzzy_score_title_words,
+)
 from lib_chat_bot.catalog.intent_detector import detect_query_intent
+from lib_chat_bot.catalog.index import CatalogIndex
 import re
 
+CATALOG_FILE = Path(__file__).parent / 'SDLLista14nov2025.xlsx'
+
 
 def normalize_query(query: str) -> str:
     """Extrae solo el nombre del autor de queries conversacionales."""
@@ -36,40 +44,28 @@ def normalize_query(query: str) -> str:
     return query
 
 
-def load_books():
-    """Carga los libros del Excel una sola vez."""
-    print("📚 Cargando catálogo de libros...", end=" ", flush=True)
-    
-    df = pd.read_excel(Path(__file__).parent / 'SDLLista14nov2025.xlsx')
-    books_data = []
-    
-    for idx, row in df.iterrows():
-        id_str = str(row['Cod. Item'])
-        numeric_id = abs(hash(id_str)) % (10 ** 9)
-        title = row['TITULO'] if pd.notna(row['TITULO']) else ''
-        author = row['AUTOR'] if pd.notna(row['AUTOR']) else None
-        publisher = row['EDITORIAL'] if pd.notna(row['EDITORIAL']) else None
-        isbn = row['ISBN'] if pd.notna(row['ISBN']) else None
-        
-        if not title:
-            continue
-        
-        book = Book(
-            id=numeric_id,
-            title=str(title),
-            author=str(author) if author else None,
-            publisher=str(publisher) if publisher else None,
-            isbn=str(isbn) if isbn else None,
-            stock=int(row['Existencia']) if pd.notna(row['Existencia']) else 0,
-        )
-        books_data.append(book)
-    
-    print(f"✅ {len(books_data)} libros cargados")
-    return books_data
+def load_index():
+    """
+    Abre el catálogo ya indexado desde el índice compartido (mapeado en
+    memoria): varios procesos con el buscador comparten una sola copia en
+    el page cache y el arranque no re-indexa nada.
+    """
+    print("📚 Cargando índice del catálogo...", end=" ", flush=True)
+
+    index = load_shared_index(CATALOG_FILE)
 
+    print(f"✅ {len(index)} libros indexados")
+    return index
+
+
+def search_books(query: str, books_data) -> list:
+    """
+    Ejecuta la búsqueda y devuelve los libros encontrados.
+    `books_data` puede ser un `CatalogIndex` (lo normal) o la lista de libros,
+    en cuyo caso se indexa en el momento.
+    """
+    index = books_data if isinstance(books_data, CatalogIndex) else CatalogIndex(books_data)
 
-def search_books(query: str, books_data: list) -> list:
-    """Ejecuta la búsqueda y devuelve los libros encontrados."""
     # Normalizar query si es conversacional
     normalized_query = normalize_query(query)
     if normalized_query != query:
@@ -77,45 +73,36 @@ def search_books(query: str, books_data: list) -> list:
     
     intent = detect_query_intent(normalized_query)
     query_words = set(normalized_query.lower().split())
-    matching_books = []
-
-    for book in books_data:
-        title_lower = (book.title or '').lower()
-        author_lower = (book.author or '').lower()
-        isbn_clean = (book.isbn or '').replace('-', '').replace(' ', '')
-
-        if intent == "isbn":
-            # ISBN search: exact match only
-            query_clean = normalized_query.replace('-', '').replace(' ', '')
-            if isbn_clean == query_clean:
-                matching_books.append(book)
-        elif intent == "author":
-            author_score = fuzzy_score_author(normalized_query, book.author or "", threshold=75)
-            if author_score >= 75:
-                matching_books.append(book)
-        else:
-            # Title search: first try exact words, then fuzzy matching
-            exact_match = False
-            for word in query_words:
-                if len(word) > 2 and (word in title_lower or word in author_lower):
-                    matching_books.append(book)
-                    exact_match = True
-                    break
-            
-            # Fallback: fuzzy match on title if no exact word match
-            if not exact_match:
-                title_score = fuzzy_score_title(normalized_query, book.title or "", threshold=70)
-                if title_score >= 70:
-                    matching_books.append(book)
-
-    # Fallback: Si intent es "author" pero no hay resultados, reintentar con threshold más bajo
-    if intent == "author" and not matching_books:
-        for book in books_data:
-            author_score = fuzzy_score_author(normalized_query, book.author or "", threshold=60)
-            if author_score >= 60:
-                matching_books.append(book)
-
-    return matching_books
+    fuzzy_query_words = significant_words(normalize(normalized_query))
+
+    if intent == "isbn":
+        # ISBN search: exact match only
+        return index.books_at(index.find_isbn(normalized_query))
+
+    if intent == "author":
+        # Un fuzzy por autor distinto; si no hay resultados, reintentar con threshold más bajo
+        return index.books_at(index.match_authors(fuzzy_query_words, threshold=75, retry_threshold=60))
+
+    # Title search: first try exact words, then fuzzy matching
+    matched = set()
+    for word in query_words:
+        if len(word) <= 2:
+            continue
+        for pos in index.substring_candidates(("title", "author"), word):
+            title = index.books.text("title", pos) or ''
+            author = index.books.text("author", pos) or ''
+            if word in title.lower() or word in author.lower():
+                matched.add(pos)
+
+    # Fallback: fuzzy match on title if no exact word match
+    for pos in index.fuzzy_candidates("title", fuzzy_query_words, threshold=70):
+        if pos not in matched:
+            title_words = significant_words(normalize(index.books.text("title", pos) or ''))
+            title_score = fuzzy_score_title_words(fuzzy_query_words, title_words, threshold=70)
+            if title_score >= 70:
+                matched.add(pos)
+
+    return index.books_at(sorted(matched))
 
 
 def display_results(matching_books: list, query: str, max_results: int = 10):
@@ -145,8 +132,8 @@ def main():
     print("🔍 BUSCADOR DE LIBROS - Catálogo Interactivo".center(100))
     print("=" * 100 + "\n")
     
-    # Cargar libros una sola vez
-    books_data = load_books()
+    # Índice compartido: se construye solo la primera vez o si cambió la planilla
+    books_data = load_index()
     print()
     
     while True:
@@ -0,0 +1,109 @@
+"""
+Overlay de disponibilidad (stock y precio) con TTL corto.
+
+Título, autor y categoría casi no cambian, pero stock y precio cambian todo
+el tiempo. En lugar de guardarlos en la misma entrada de caché que los
+metadatos (y elegir entre servir stock viejo o tirar metadatos buenos), las
+cachés de búsqueda guardan los libros con un TTL largo y el stock/precio
+vigente de cada libro vive aparte, por id, con un TTL de segundos:
+
+    overlay = get_overlay()
+    overlay.update(books_from_api)     # cada respuesta de la API lo refresca
+    overlay.apply(cached_books)        # copias con stock/precio vigentes
+    overlay.stale(cached_books)        # los que hay que volver a consultar
+
+El bonus por stock de `score_book` lee el stock con `current_stock`.
+
+Cada dato se registra por id y, si el libro tiene ISBN, también por su ISBN
+canónico: así los libros del índice local (con ids derivados de `Cod. Item`)
+reciben el stock que la API informa para el mismo ISBN.
+"""
+
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from .cache import TTLCache
+from .isbn import canonical_isbn
+from .models import Book
+
+AVAILABILITY_TTL = float(os.getenv("SODILIBRO_AVAILABILITY_TTL", "30"))
+AVAILABILITY_MAX_ENTRIES = int(os.getenv("SODILIBRO_AVAILABILITY_MAX_ENTRIES", "65536"))
+
+# (stock, precio) de un libro
+Availability = Tuple[Optional[int], Optional[float]]
+
+
+class AvailabilityOverlay:
+    """Stock y precio vigentes por id de libro (expiran a los `ttl` segundos)"""
+
+    def __init__(self, ttl: float = AVAILABILITY_TTL, max_entries: int = AVAILABILITY_MAX_ENTRIES):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+        # Libros cuyo refresco ya se intentó (aunque la API no los devolviera):
+        # no se vuelven a consultar hasta que venza el TTL
+        self._checked = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, book_id: int) -> Optional[Availability]:
+        return self._cache.get(book_id)
+
+    def _lookup(self, book: Book) -> Optional[Availability]:
+        """Dato fresco del libro, por id o, si no hay, por ISBN"""
+        entry = self._cache.get(book.id)
+        if entry is None and book.isbn:
+            entry = self._cache.get(("isbn", canonical_isbn(book.isbn)))
+        return entry
+
+    def update(self, books: Iterable[Book]) -> None:
+        """Registra el stock y precio de libros recién traídos de la API"""
+        for book in books:
+            self._cache.set(book.id, (book.stock, book.price))
+            if book.isbn:
+                self._cache.set(("isbn", canonical_isbn(book.isbn)), (book.stock, book.price))
+
+    def stock(self, book: Book) -> Optional[int]:
+        """Stock vigente del libro (el del propio libro si no hay dato fresco)"""
+        entry = self._lookup(book)
+        return book.stock if entry is None else entry[0]
+
+    def stale(self, books: Iterable[Book]) -> List[Book]:
+        """Libros sin stock/precio fresco en el overlay ni un refresco reciente intentado"""
+        return [book for book in books if self._lookup(book) is None and book.id not in self._checked]
+
+    def mark_checked(self, books: Iterable[Book]) -> None:
+        """Registra que ya se intentó refrescar estos libros (encontrados o no)"""
+        for book in books:
+            self._checked.set(book.id, True)
+
+    def apply(self, books: Iterable[Book]) -> List[Book]:
+        """Copias de los libros con el stock y precio del overlay (si los hay)"""
+        result = []
+        for book in books:
+            entry = self._lookup(book)
+            if entry is not None and entry != (book.stock, book.price):
+                book = book.model_copy(update={"stock": entry[0], "price": entry[1]})
+            result.append(book)
+        return result
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._checked.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+_overlay = AvailabilityOverlay()
+
+
+def get_overlay() -> AvailabilityOverlay:
+    return _overlay
+
+
+def use_overlay(overlay: AvailabilityOverlay) -> None:
+    """Cambia el overlay del proceso (ej: uno con otro TTL)"""
+    global _overlay
+    _overlay = overlay
+
+
+def current_stock(book: Book) -> Optional[int]:
+    """Stock a usar en el scoring: el del overlay si está fresco, si no el del libro"""
+    return _overlay.stock(book)
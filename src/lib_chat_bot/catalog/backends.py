@@ -0,0 +1,233 @@
+"""
+Backends de búsqueda del catálogo.
+
+`CatalogBackend` es la interfaz común: `search` / `search_async` retornan
+libros ya rerankeados con `rerank_books`, vengan de la API o del índice
+local.
+
+- `RemoteApiBackend`: la escalera de fallback de `client.search_books`
+  contra la API de SODILIBRO (con sus cachés y single-flight).
+- `LocalIndexBackend`: un `CatalogIndex` en memoria o mapeado desde
+  `shared_index`; no hace ninguna llamada de red.
+- `HybridBackend`: responde desde el índice local y solo va a la API si
+  no hay resultados locales o para refrescar el stock y precio de los
+  libros mostrados (overlay de disponibilidad).
+
+El backend por defecto se elige con SODILIBRO_BACKEND (remote | local | hybrid):
+
+    backend = get_backend()
+    backend.search("gestion ambiental", limit=10)
+
+Al arrancar el servidor conviene llamar a `warm_up()`, para que abrir el
+índice y armar el corrector de typos no lo pague la primera consulta.
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Union, runtime_checkable
+
+from .models import Book
+from .index import CatalogIndex
+from .availability import get_overlay
+from .fallback import TYPO_VOCABULARY, load_typo_corrector, use_catalog_vocabulary
+from .intent_detector import detect_query_intent
+from .search_engine import normalize, rerank_books, significant_words
+
+logger = logging.getLogger(__name__)
+
+BACKEND = os.getenv("SODILIBRO_BACKEND", "remote").lower()
+LOCAL_INDEX_PATH = os.getenv("SODILIBRO_LOCAL_INDEX", "")
+
+# Candidatos locales que pasan al rerank (el scoring es lo caro)
+LOCAL_CANDIDATES = int(os.getenv("SODILIBRO_LOCAL_CANDIDATES", "200"))
+
+# Campos donde se buscan los tokens de la query en el índice local
+_LOCAL_FIELDS = ("title", "author", "publisher")
+_NGRAM_FIELDS = ("title", "author")
+
+
+@runtime_checkable
+class CatalogBackend(Protocol):
+    """Fuente de libros para una query, con el ranking ya aplicado"""
+
+    def search(self, query: str, limit: int = 20) -> List[Book]:
+        ...
+
+    async def search_async(self, query: str, limit: int = 20) -> List[Book]:
+        ...
+
+
+class RemoteApiBackend:
+    """Búsqueda contra la API de SODILIBRO (`client.search_books`)"""
+
+    def __init__(self, speculative: Optional[bool] = None, budget: Optional[int] = None):
+        self.speculative = speculative
+        self.budget = budget
+
+    def search(self, query: str, limit: int = 20) -> List[Book]:
+        # Import diferido: `client` arma sus cachés al importarse
+        from .client import search_books
+
+        return search_books(query, limit, speculative=self.speculative, budget=self.budget)
+
+    async def search_async(self, query: str, limit: int = 20) -> List[Book]:
+        from .client import search_books_async
+
+        return await search_books_async(query, limit, speculative=self.speculative, budget=self.budget)
+
+
+class LocalIndexBackend:
+    """
+    Búsqueda sobre el índice local, sin red:
+
+    1) ISBN: búsqueda exacta en el mapa de ISBN (sin rerank, como la API)
+    2) Libros con algún token exacto de la query en título, autor o
+       editorial, priorizando los que tienen más tokens de la query
+    3) Si no hay ninguno (typos), candidatos por n-gramas de título y autor
+
+    Los mejores `candidate_limit` candidatos pasan por `rerank_books`. El
+    stock y precio del espejo se reemplazan por los del overlay de
+    disponibilidad cuando este tiene un dato fresco.
+    """
+
+    def __init__(self, index: CatalogIndex, candidate_limit: int = LOCAL_CANDIDATES):
+        self.index = index
+        self.candidate_limit = candidate_limit
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], **kwargs) -> "LocalIndexBackend":
+        """Abre un índice compartido (`shared_index`) ya construido"""
+        from .shared_index import open_shared_index
+
+        index, _ = open_shared_index(path)
+        return cls(index, **kwargs)
+
+    def candidates(self, query: str) -> List[int]:
+        """Posiciones candidatas en el índice, de más a menos prometedora"""
+        words = significant_words(normalize(query)) or normalize(query).split()
+        if not words:
+            return []
+
+        hits: Dict[int, float] = {}
+        for word in dict.fromkeys(words):
+            matched = set()
+            for field in _LOCAL_FIELDS:
+                matched.update(self.index.postings(field, word))
+            for pos in matched:
+                hits[pos] = hits.get(pos, 0) + 1
+
+        if not hits:
+            logger.debug(f"🔤 Sin tokens exactos en el índice local, probando n-gramas: {query}")
+            for field in _NGRAM_FIELDS:
+                for pos, score in self.index.ngram_candidates(field, words, limit=self.candidate_limit):
+                    if score > hits.get(pos, 0):
+                        hits[pos] = score
+
+        ranked = sorted(hits, key=lambda pos: (-hits[pos], pos))
+        return ranked[:self.candidate_limit]
+
+    def search(self, query: str, limit: int = 20) -> List[Book]:
+        if detect_query_intent(query) == "isbn":
+            return get_overlay().apply(self.index.books_at(self.index.find_isbn(query)[:limit]))
+
+        positions = self.candidates(query)
+        if not positions:
+            return []
+        books = rerank_books(self.index.books_at(sorted(positions)), query)
+        return get_overlay().apply(books[:limit])
+
+    async def search_async(self, query: str, limit: int = 20) -> List[Book]:
+        # Sin I/O: el índice está en memoria (o mapeado), se resuelve en el acto
+        return self.search(query, limit)
+
+
+class HybridBackend:
+    """
+    Índice local primero; la API solo para las queries sin resultados
+    locales (menos de `min_results`).
+
+    Los primeros `shown` libros locales (por defecto
+    SODILIBRO_AVAILABILITY_SHOWN) sin stock/precio fresco en el overlay se
+    refrescan en bloque, igual que en `client.search_books`; `shown=0` lo
+    desactiva.
+    """
+
+    def __init__(
+        self,
+        local: LocalIndexBackend,
+        remote: Optional[CatalogBackend] = None,
+        min_results: int = 1,
+        shown: Optional[int] = None,
+    ):
+        self.local = local
+        self.remote = remote or RemoteApiBackend()
+        self.min_results = min_results
+        self.shown = shown
+
+    def search(self, query: str, limit: int = 20) -> List[Book]:
+        books = self.local.search(query, limit)
+        if len(books) < self.min_results:
+            logger.debug(f"🌐 Sin resultados locales, consultando la API: {query}")
+            return self.remote.search(query, limit)
+        from .client import AVAILABILITY_SHOWN, _with_fresh_availability
+
+        return _with_fresh_availability(books, AVAILABILITY_SHOWN if self.shown is None else self.shown)
+
+    async def search_async(self, query: str, limit: int = 20) -> List[Book]:
+        books = await self.local.search_async(query, limit)
+        if len(books) < self.min_results:
+            logger.debug(f"🌐 Sin resultados locales, consultando la API: {query}")
+            return await self.remote.search_async(query, limit)
+        from .client import AVAILABILITY_SHOWN, _with_fresh_availability_async
+
+        return await _with_fresh_availability_async(books, AVAILABILITY_SHOWN if self.shown is None else self.shown)
+
+
+_backend: Optional[CatalogBackend] = None
+_backend_lock = threading.Lock()
+
+
+def _build_backend() -> CatalogBackend:
+    if BACKEND == "remote":
+        return RemoteApiBackend()
+    if BACKEND not in ("local", "hybrid"):
+        raise ValueError(f"SODILIBRO_BACKEND desconocido: {BACKEND}")
+    if not LOCAL_INDEX_PATH:
+        raise ValueError(f"SODILIBRO_BACKEND={BACKEND} requiere SODILIBRO_LOCAL_INDEX")
+
+    local = LocalIndexBackend.from_file(LOCAL_INDEX_PATH)
+    logger.info(f"📚 Índice local abierto desde {LOCAL_INDEX_PATH} ({len(local.index)} libros)")
+    # El fallback de la API (modo híbrido) corrige typos con el vocabulario del mismo índice
+    if TYPO_VOCABULARY == "catalog":
+        use_catalog_vocabulary(local.index)
+    return local if BACKEND == "local" else HybridBackend(local)
+
+
+def get_backend() -> CatalogBackend:
+    """Backend por defecto del proceso (según SODILIBRO_BACKEND), creado la primera vez"""
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _build_backend()
+    return _backend
+
+
+def warm_up() -> CatalogBackend:
+    """
+    Prepara lo costoso antes de la primera consulta: el backend por defecto
+    (abre el índice local) y el corrector de typos con el vocabulario del
+    catálogo. Llamar una vez al arrancar el servidor.
+    """
+    backend = get_backend()
+    load_typo_corrector()
+    return backend
+
+
+def set_backend(backend: Optional[CatalogBackend]) -> None:
+    """Instala el backend por defecto; `None` lo vuelve a construir según el entorno"""
+    global _backend
+    _backend = backend
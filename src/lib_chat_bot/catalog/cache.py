@@ -0,0 +1,214 @@
+"""
+Caché en memoria con expiración (TTL) y desalojo LRU.
+
+Reemplaza los `dict` sin límite usados como caché: cada entrada expira tras
+`ttl` segundos y, al superar `max_entries` o `max_bytes`, se desalojan las
+entradas menos usadas recientemente. Expone contadores de aciertos, fallos y
+desalojos para poder dimensionarla con tráfico real.
+"""
+
+import sys
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+def approx_size(value: Any) -> int:
+    """
+    Tamaño aproximado en bytes de un valor cacheado (listas de `Book`,
+    strings, números...). No pretende ser exacto, solo proporcional.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + approx_size(vars(value))
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    """
+    Caché LRU con TTL por entrada, límite de entradas y (opcional) de bytes.
+    Es segura entre hilos y se usa como un dict:
+
+        cache = TTLCache(max_entries=1000, ttl=300)
+        cache["harry potter:20"] = books
+        cache.get("harry potter:20")
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 300,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = approx_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._lock = threading.RLock()
+        # key -> (valor, expira_en, tamaño)
+        self._data: "OrderedDict[Hashable, tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        # Barrido completo de expiradas: solo si alguna pudo vencer, y a lo sumo
+        # una vez cada `_sweep_interval` segundos (sin TTL nunca se barre)
+        self._earliest_expiry = math.inf
+        self._sweep_interval = (ttl or 60.0) / 10
+        self._last_sweep = -math.inf
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna el valor si existe y no expiró (y lo marca como recién usado)"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        """Guarda un valor; `ttl` permite sobrescribir el TTL por defecto para esta entrada"""
+        if ttl is _MISSING:
+            ttl = self.ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+        size = self._sizeof(value) if self.max_bytes else 0
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            if expires_at is not None and expires_at < self._earliest_expiry:
+                self._earliest_expiry = expires_at
+            self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._earliest_expiry = math.inf
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Contadores para dimensionar la caché"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _over_limit(self) -> bool:
+        return len(self._data) > self.max_entries or bool(self.max_bytes and self._bytes > self.max_bytes)
+
+    def _evict(self) -> None:
+        if not self._over_limit():
+            return
+
+        # Primero descartar lo expirado, luego lo menos usado recientemente.
+        # Lo expirado en la cabeza LRU sale en O(1); el barrido completo es O(n)
+        # y solo corre cuando alguna entrada pudo vencer
+        now = self._clock()
+        if now >= self._earliest_expiry and now - self._last_sweep >= self._sweep_interval:
+            self._sweep(now)
+        while self._data:
+            oldest = next(iter(self._data))
+            expires_at = self._data[oldest][1]
+            if expires_at is not None and expires_at <= now:
+                self._remove(oldest)
+                self.expirations += 1
+            elif self._over_limit():
+                self._remove(oldest)
+                self.evictions += 1
+            else:
+                break
+
+    def _sweep(self, now: float) -> None:
+        """Descarta todas las entradas expiradas y recalcula la próxima expiración"""
+        self._last_sweep = now
+        earliest = math.inf
+        expired = []
+        for key, (_, expires_at, _) in self._data.items():
+            if expires_at is None:
+                continue
+            if expires_at <= now:
+                expired.append(key)
+            elif expires_at < earliest:
+                earliest = expires_at
+        for key in expired:
+            self._remove(key)
+            self.expirations += 1
+        self._earliest_expiry = earliest
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        with self._lock:
+            if key not in self._data:
+                raise KeyError(key)
+            self._remove(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """No cuenta como acierto/fallo; solo indica si hay una entrada vigente"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[1]
+            return expires_at is None or expires_at > self._clock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -1,11 +1,23 @@
 import os
-import httpx
+import asyncio
 import logging
-from typing import List
-from functools import lru_cache
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Generator, List, Optional, Tuple, Union
+from functools import lru_cache, partial
+
+import httpx
 
 from .models import Book
-from .search_engine import rerank_books
+from .cache import TTLCache
+from .availability import get_overlay
+from .sqlite_cache import SQLiteCache
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .http_client import VERIFY_SSL, get_client, get_async_client
+from .search_engine import normalize, rerank_books
+from .intent_detector import detect_query_intent
+from .isbn import canonical_isbn, clean_isbn, isbn_forms
 from .synonyms import TITLE_ALIASES
 from .fallback import (
     simplify_query,
@@ -20,32 +32,85 @@ logger = logging.getLogger(__name__)
 
 BASE_URL = "https://www.sodilibro.com:8000/api/shopcart/vwitemTienda/"
 
-# ⚠️ Certificado SSL inválido en entorno SODILIBRO
-VERIFY_SSL = os.getenv("SODILIBRO_VERIFY_SSL", "false").lower() == "true"
+# Caché de búsquedas (LRU acotada con TTL). Los metadatos casi no cambian, así
+# que el TTL es largo: stock y precio vigentes salen del overlay de disponibilidad
+# SODILIBRO_CACHE_BACKEND=sqlite la hace persistente y compartida entre workers
+CACHE_BACKEND = os.getenv("SODILIBRO_CACHE_BACKEND", "memory").lower()
+CACHE_PATH = os.getenv(
+    "SODILIBRO_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "sodilibro_search_cache.sqlite3"),
+)
+CACHE_MAX_ENTRIES = int(os.getenv("SODILIBRO_CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL = float(os.getenv("SODILIBRO_CACHE_TTL", "3600"))
+CACHE_MAX_BYTES = int(os.getenv("SODILIBRO_CACHE_MAX_BYTES", "0")) or None
 
-# Caché de búsquedas en memoria
-_search_cache: dict[str, List[Book]] = {}
 
+def _build_search_cache() -> Union[TTLCache, SQLiteCache]:
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteCache(CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+    return TTLCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES)
 
-def _call_api(query: str, limit: int = 20) -> List[Book]:
-    """Llamada directa a la API de SODILIBRO"""
-    params = [
+
+_search_cache = _build_search_cache()
+
+# Caché negativa (TTL corto): queries que agotaron la escalera y sondas que
+# devolvieron [] se saltan sin llamar a la API mientras no expiren
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("SODILIBRO_NEGATIVE_CACHE_MAX_ENTRIES", "4096"))
+NEGATIVE_CACHE_TTL = float(os.getenv("SODILIBRO_NEGATIVE_CACHE_TTL", "60"))
+_negative_cache = TTLCache(max_entries=NEGATIVE_CACHE_MAX_ENTRIES, ttl=NEGATIVE_CACHE_TTL)
+
+# Caché por sonda: resultados crudos de la API por (query enviada, limit),
+# compartida entre queries de usuario distintas que llegan a la misma sonda
+PROBE_CACHE_MAX_ENTRIES = int(os.getenv("SODILIBRO_PROBE_CACHE_MAX_ENTRIES", "4096"))
+PROBE_CACHE_TTL = float(os.getenv("SODILIBRO_PROBE_CACHE_TTL", str(CACHE_TTL)))
+_probe_cache = TTLCache(max_entries=PROBE_CACHE_MAX_ENTRIES, ttl=PROBE_CACHE_TTL)
+
+# Single-flight: búsquedas/sondas idénticas concurrentes comparten una sola petición
+_search_flight = SingleFlight()
+_search_flight_async = AsyncSingleFlight()
+_probe_flight = SingleFlight()
+_probe_flight_async = AsyncSingleFlight()
+
+# Hilos para lanzar sondas concurrentes desde la API sync (ej: alias)
+PROBE_WORKERS = int(os.getenv("SODILIBRO_PROBE_WORKERS", "8"))
+_probe_executor: Optional[ThreadPoolExecutor] = None
+_probe_executor_lock = threading.Lock()
+
+# Libros (los primeros del resultado, los que se muestran) cuyo stock/precio se
+# refresca antes de responder si el overlay no tiene un dato fresco (0 = nunca)
+AVAILABILITY_SHOWN = int(os.getenv("SODILIBRO_AVAILABILITY_SHOWN", "5"))
+AVAILABILITY_PROBE_LIMIT = int(os.getenv("SODILIBRO_AVAILABILITY_PROBE_LIMIT", "5"))
+
+# Modo especulativo: lanzar por adelantado las siguientes etapas de fallback
+SPECULATIVE_FALLBACK = os.getenv("SODILIBRO_SPECULATIVE", "false").lower() == "true"
+# Máximo de sondas especulativas en vuelo a la vez
+SPECULATIVE_BUDGET = int(os.getenv("SODILIBRO_SPECULATIVE_BUDGET", "4"))
+
+
+# Una "sonda" es una llamada concreta a la API: (query, limit)
+Probe = Tuple[str, int]
+
+
+def _build_params(query: str, limit: int, offset: int = 0) -> list[tuple[str, str]]:
+    return [
         ("opcion", "dynamic"),
         ("limit", str(limit)),
-        ("offset", "0"),
+        ("offset", str(offset)),
         ("search", ""),
         ("search", query),
     ]
 
-    response = httpx.get(
-        BASE_URL,
-        params=params,
-        timeout=15,
-        verify=VERIFY_SSL,
-    )
+
+def _call_api(query: str, limit: int = 20) -> List[Book]:
+    """Llamada directa a la API de SODILIBRO (usa el cliente HTTP compartido)"""
+    response = get_client().get(BASE_URL, params=_build_params(query, limit))
     response.raise_for_status()
 
-    data = response.json()
+    return _parse_books(response.json())
+
+
+def _parse_books(data: dict) -> List[Book]:
+    """Convierte la respuesta JSON de la API en objetos Book"""
     results = data.get("results", [])
 
     books: List[Book] = []
@@ -69,63 +134,181 @@ def _call_api(query: str, limit: int = 20) -> List[Book]:
     return books
 
 
-def search_books(query: str, limit: int = 20) -> List[Book]:
+async def _call_api_async(query: str, limit: int = 20) -> List[Book]:
+    """Versión async de `_call_api` (usa el cliente async compartido)"""
+    response = await get_async_client().get(BASE_URL, params=_build_params(query, limit))
+    response.raise_for_status()
+
+    return _parse_books(response.json())
+
+
+def _cached_probe(probe: Probe) -> Optional[List[Book]]:
+    """Resultado de una sonda si está en la caché por sonda o en la negativa"""
+    books = _probe_cache.get(probe)
+    if books is not None:
+        logger.debug(f"📦 Sonda obtenida del caché: {probe[0]}")
+        return list(books)
+    if probe in _negative_cache:
+        logger.debug(f"🚫 Sonda sin resultados en caché: {probe[0]}")
+        return []
+    return None
+
+
+def _store_probe(probe: Probe, books: List[Book]) -> None:
+    # Toda respuesta de la API trae stock y precio frescos
+    get_overlay().update(books)
+    if books:
+        _probe_cache[probe] = list(books)
+    else:
+        _negative_cache[probe] = True
+
+
+def _probe_api(query: str, limit: int = 20) -> List[Book]:
+    """`_call_api` detrás de la caché por sonda (positiva y negativa)"""
+    probe = (query, limit)
+    cached = _cached_probe(probe)
+    if cached is not None:
+        return cached
+
+    return list(_probe_flight.do(probe, _fetch_and_store_probe, probe))
+
+
+def _fetch_and_store_probe(probe: Probe) -> List[Book]:
+    books = _call_api(*probe)
+    _store_probe(probe, books)
+    return books
+
+
+async def _probe_api_async(query: str, limit: int = 20) -> List[Book]:
+    """Versión async de `_probe_api`"""
+    probe = (query, limit)
+    cached = _cached_probe(probe)
+    if cached is not None:
+        return cached
+
+    return list(await _probe_flight_async.do(probe, _fetch_and_store_probe_async, probe))
+
+
+async def _fetch_and_store_probe_async(probe: Probe) -> List[Book]:
+    books = await _call_api_async(*probe)
+    _store_probe(probe, books)
+    return books
+
+
+Ladder = Generator[List[Probe], List[List[Book]], List[Book]]
+
+
+def _cache_key(query: str, limit: int) -> str:
     """
-    Búsqueda robusta con fallback y caché:
-    0) Revisar caché
-    0.5) Intentar alias de títulos conocidos (ej: "harry potter 1" -> "piedra filosofal 1")
-    1) Corregir typos y reintentar
-    2) query original
-    3) query simplificada
-    4) keywords + números de serie
-    5) prefijos
+    Clave canónica de caché: query normalizada (minúsculas, sin tildes ni
+    puntuación, espacios colapsados) + intent + limit. El intent se incluye
+    porque `detect_query_intent` distingue mayúsculas ("José ZAPATA" es autor)
+    y cambia el ranking; así un acierto devuelve siempre el mismo orden que
+    devolvería la búsqueda completa.
+    """
+    canonical = " ".join(normalize(query).split())
+    return f"{canonical}:{detect_query_intent(query)}:{limit}"
+
+
+def _search_ladder(query: str, limit: int, cache_key: Optional[str] = None) -> Ladder:
+    """
+    Escalera de fallback independiente del transporte (sync/async).
+
+    En cada paso hace `yield` de las sondas que necesita y recibe la lista de
+    resultados en el mismo orden. El valor de retorno es la lista final ya
+    rerankeada. Así `search_books` y `search_books_async` comparten
+    exactamente la misma lógica.
+
+    Se cachea el resultado final rerankeado, de modo que un acierto de caché
+    es una sola búsqueda en un dict y devuelve el mismo orden que un fallo.
+    Las queries sin resultados van a la caché negativa (TTL corto).
     """
 
     # 0️⃣ Revisar caché
-    cache_key = f"{query}:{limit}"
-    if cache_key in _search_cache:
+    if cache_key is None:
+        cache_key = _cache_key(query, limit)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
         logger.debug(f"📦 Resultado obtenido del caché para: {query}")
-        return _search_cache[cache_key]
+        return list(cached)
+    if cache_key in _negative_cache:
+        logger.debug(f"🚫 Query sin resultados en caché: {query}")
+        return []
+
+    result = yield from _fallback_ladder(query, limit)
+    if result:
+        _search_cache[cache_key] = list(result)
+    else:
+        _negative_cache[cache_key] = True
+    return result
+
+
+def _isbn_ladder(query: str, limit: int) -> Ladder:
+    """
+    Camino rápido para ISBN: sondas exactas en paralelo, sin etapas de
+    fallback ni rerank fuzzy. Se envía la forma tal como llegó y su
+    equivalente ISBN-10 <-> ISBN-13 (el catálogo guarda casi todo como
+    ISBN-13, pero algunos libros solo con ISBN-10). Los libros cuyo ISBN
+    coincide van primero, el resto conserva el orden de la API.
+    """
+    target = canonical_isbn(query)
+    forms = isbn_forms(query)
+    logger.debug(f"🔢 Búsqueda por ISBN: {', '.join(forms)}")
+    results = yield [(isbn, limit) for isbn in forms]
+
+    exact, others, seen = [], [], set()
+    for books in results:
+        for book in books:
+            if book.id in seen:
+                continue
+            seen.add(book.id)
+            (exact if canonical_isbn(book.isbn or "") == target else others).append(book)
+    if exact:
+        logger.info(f"✅ Encontrados {len(exact)} libros con ISBN {target}")
+    return (exact + others)[:limit]
+
+
+def _fallback_ladder(query: str, limit: int) -> Ladder:
+    """Etapas de fallback (sin caché); retorna la lista rerankeada o []"""
+
+    if detect_query_intent(query) == "isbn":
+        return (yield from _isbn_ladder(query, limit))
 
     # 0.5️⃣ Intentar alias de títulos conocidos
+    alias_books: List[Book] = []
     query_normalized = query.lower().strip()
     if query_normalized in TITLE_ALIASES:
         logger.debug(f"🎯 Usando alias para query: {query}")
-        all_books = []
-        # Para cada alias, pedir resultados
+        # Para cada alias, pedir resultados (todas las sondas se lanzan en paralelo)
         # Los primeros alias (más específicos) piden más para asegurar diversidad
+        alias_probes = []
         for i, alias_query in enumerate(TITLE_ALIASES[query_normalized]):
             # Primer alias: pedir más; siguientes: pedir menos para llenar
             api_limit = limit if i == 0 else (limit // 2)
             logger.debug(f"🔍 Buscando con alias ({i+1}): {alias_query} (limit={api_limit})")
-            books = _call_api(alias_query, api_limit)
+            alias_probes.append((alias_query, api_limit))
+
+        # Los resultados llegan en el orden de los alias, así el merge no cambia
+        alias_results = yield alias_probes
+        for books in alias_results:
             if books:
-                all_books.extend(books)
+                alias_books.extend(books)
 
-        if all_books and len(all_books) >= 5:  # Solo retornar si hay suficientes resultados
+        if alias_books and len(alias_books) >= 5:  # Solo retornar si hay suficientes resultados
             # Eliminar duplicados por ID, preservando el orden original
-            seen_ids = set()
-            unique_books = []
-            for book in all_books:
-                if book.id not in seen_ids:
-                    unique_books.append(book)
-                    seen_ids.add(book.id)
-
-            result = unique_books[:limit]
-            _search_cache[cache_key] = result
+            result = _dedup_books(alias_books)[:limit]
             logger.info(f"✅ Encontrados {len(result)} libros únicos con alias")
             # Reranquear todos los resultados combinados por relevancia a la query original
             return rerank_books(result, query)
 
         # Si hay menos de 5 resultados, continuar con fallback para completar
-        if all_books:
-            logger.debug(f"⚠️ Alias devolvió pocos resultados ({len(all_books)}), continuando con fallback...")
+        if alias_books:
+            logger.debug(f"⚠️ Alias devolvió pocos resultados ({len(alias_books)}), continuando con fallback...")
 
     # 1️⃣ Intento directo
     logger.debug(f"🔍 Buscando: {query}")
-    books = _call_api(query, limit)
+    [books] = yield [(query, limit)]
     if books:
-        _search_cache[cache_key] = books
         logger.info(f"✅ Encontrados {len(books)} libros con query directa")
         return rerank_books(books, query)
 
@@ -133,28 +316,16 @@ def search_books(query: str, limit: int = 20) -> List[Book]:
     corrected = correct_query_typos(query)
     if corrected != query:
         logger.debug(f"🔧 Query corregida: {query} → {corrected}")
-        books_corrected = _call_api(corrected, limit)
+        [books_corrected] = yield [(corrected, limit)]
 
         # Si hay libros del alias previo, combinarlos con los corregidos
-        alias_ids_set = set()
-        if 'all_books' in locals() and all_books:
-            alias_ids_set = {book.id for book in all_books}
-            all_books.extend(books_corrected)
-            seen_ids = set()
-            unique_books = []
-            for book in all_books:
-                if book.id not in seen_ids:
-                    unique_books.append(book)
-                    seen_ids.add(book.id)
-            result = unique_books[:limit]
-            _search_cache[cache_key] = result
+        if alias_books:
+            alias_ids_set = {book.id for book in alias_books}
+            result = _dedup_books(alias_books + books_corrected)[:limit]
             logger.info(f"✅ Encontrados {len(result)} libros combinando alias + corrección de typos")
             # Reranquear preservando los libros del alias en posiciones altas
             return rerank_books(result, query, boost_ids=alias_ids_set)
         elif books_corrected:
-            cache_key_corrected = f"{corrected}:{limit}"
-            _search_cache[cache_key] = books_corrected
-            _search_cache[cache_key_corrected] = books_corrected
             logger.info(f"✅ Encontrados {len(books_corrected)} libros con query corregida")
             return rerank_books(books_corrected, query)
 
@@ -162,9 +333,8 @@ def search_books(query: str, limit: int = 20) -> List[Book]:
     simplified = simplify_query(query)
     if simplified and simplified != query:
         logger.debug(f"🔄 Intentando query simplificada: {simplified}")
-        books = _call_api(simplified, limit)
+        [books] = yield [(simplified, limit)]
         if books:
-            _search_cache[cache_key] = books
             logger.info(f"✅ Encontrados {len(books)} libros con query simplificada")
             return rerank_books(books, query)
 
@@ -182,7 +352,7 @@ def search_books(query: str, limit: int = 20) -> List[Book]:
             for keyword in keywords:
                 combined_query = f"{keyword} {number}"
                 logger.debug(f"🔍 Buscando combinación: {combined_query}")
-                books = _call_api(combined_query, limit)
+                [books] = yield [(combined_query, limit)]
                 if books:
                     all_books.extend(books)
 
@@ -191,7 +361,6 @@ def search_books(query: str, limit: int = 20) -> List[Book]:
             # Eliminar duplicados por ID
             unique_books = {book.id: book for book in all_books}.values()
             result = list(unique_books)[:limit]
-            _search_cache[cache_key] = result
             logger.info(f"✅ Encontrados {len(result)} libros únicos con combinaciones")
             return rerank_books(result, query)
 
@@ -199,21 +368,367 @@ def search_books(query: str, limit: int = 20) -> List[Book]:
     for keyword in keywords:
         # intento keyword directa
         logger.debug(f"🔍 Buscando keyword: {keyword}")
-        books = _call_api(keyword, limit)
+        [books] = yield [(keyword, limit)]
         if books:
-            _search_cache[cache_key] = books
             logger.info(f"✅ Encontrados {len(books)} libros con keyword: {keyword}")
             return rerank_books(books, query)
 
         # 🔥 prefijos
         for prefix in generate_prefixes(keyword):
             logger.debug(f"🔍 Buscando prefijo: {prefix}")
-            books = _call_api(prefix, limit)
+            [books] = yield [(prefix, limit)]
             if books:
-                _search_cache[cache_key] = books
                 logger.info(f"✅ Encontrados {len(books)} libros con prefijo: {prefix}")
                 return rerank_books(books, query)
 
     # ❌ No se encontró nada
     logger.warning(f"⚠️ No se encontraron libros para: {query}")
-    return []
\ No newline at end of file
+    return []
+
+
+def _fallback_plan(query: str, limit: int) -> List[Probe]:
+    """
+    Sondas que pediría `_search_ladder` si todas las etapas fallaran, en el
+    mismo orden de prioridad. El modo especulativo las lanza por adelantado;
+    si el plan se equivoca solo se desperdician llamadas, el resultado final
+    lo decide siempre la escalera.
+    """
+    if detect_query_intent(query) == "isbn":
+        return [(isbn, limit) for isbn in isbn_forms(query)]
+
+    plan: List[Probe] = []
+
+    query_normalized = query.lower().strip()
+    for i, alias_query in enumerate(TITLE_ALIASES.get(query_normalized, [])):
+        plan.append((alias_query, limit if i == 0 else (limit // 2)))
+
+    plan.append((query, limit))
+
+    corrected = correct_query_typos(query)
+    if corrected != query:
+        plan.append((corrected, limit))
+
+    simplified = simplify_query(query)
+    if simplified and simplified != query:
+        plan.append((simplified, limit))
+
+    keywords = extract_keywords(query)
+    for number in extract_series_numbers(query):
+        for keyword in keywords:
+            plan.append((f"{keyword} {number}", limit))
+
+    for keyword in keywords:
+        plan.append((keyword, limit))
+        for prefix in generate_prefixes(keyword):
+            plan.append((prefix, limit))
+
+    return plan
+
+
+def _dedup_books(books: List[Book]) -> List[Book]:
+    """Elimina duplicados por ID preservando el orden original"""
+    seen_ids = set()
+    unique_books = []
+    for book in books:
+        if book.id not in seen_ids:
+            unique_books.append(book)
+            seen_ids.add(book.id)
+    return unique_books
+
+
+def _get_probe_executor() -> ThreadPoolExecutor:
+    """Pool de hilos compartido para lanzar varias sondas sync en paralelo"""
+    global _probe_executor
+
+    if _probe_executor is None:
+        with _probe_executor_lock:
+            if _probe_executor is None:
+                _probe_executor = ThreadPoolExecutor(
+                    max_workers=PROBE_WORKERS,
+                    thread_name_prefix="sodilibro-probe",
+                )
+    return _probe_executor
+
+
+def _fetch_probes(probes: List[Probe]) -> List[List[Book]]:
+    """Ejecuta las sondas (en paralelo si hay más de una) preservando su orden"""
+    if len(probes) == 1:
+        probe_query, probe_limit = probes[0]
+        return [_probe_api(probe_query, probe_limit)]
+
+    futures = [
+        _get_probe_executor().submit(_probe_api, probe_query, probe_limit)
+        for probe_query, probe_limit in probes
+    ]
+    return [future.result() for future in futures]
+
+
+async def _fetch_probes_async(probes: List[Probe]) -> List[List[Book]]:
+    """Versión async de `_fetch_probes` (`asyncio.gather` preserva el orden)"""
+    return list(
+        await asyncio.gather(
+            *(_probe_api_async(probe_query, probe_limit) for probe_query, probe_limit in probes)
+        )
+    )
+
+
+def _run_ladder(ladder: Ladder) -> List[Book]:
+    """Ejecuta la escalera de fallback llamando a `_call_api` (bloqueante)"""
+    try:
+        probes = next(ladder)
+        while True:
+            probes = ladder.send(_fetch_probes(probes))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def _run_ladder_async(ladder: Ladder) -> List[Book]:
+    """Ejecuta la escalera de fallback con `_call_api_async` (no bloquea el event loop)"""
+    try:
+        probes = next(ladder)
+        while True:
+            probes = ladder.send(await _fetch_probes_async(probes))
+    except StopIteration as stop:
+        return stop.value
+
+
+def _run_ladder_speculative(ladder: Ladder, build_plan: Callable[[], List[Probe]], budget: int) -> List[Book]:
+    """
+    Ejecuta la escalera lanzando por adelantado hasta `budget` sondas del plan.
+    La escalera sigue consumiendo los resultados en su orden de prioridad, así
+    que gana la etapa de mayor prioridad con resultados (igual que en modo
+    secuencial) y las sondas pendientes se cancelan al terminar.
+
+    El plan se arma recién cuando la escalera pide su primera sonda: un
+    acierto de caché no paga las correcciones y variantes de la query.
+    """
+    executor = _get_probe_executor()
+    futures: dict[Probe, Future] = {}
+    plan: List[Probe] = []
+    next_index = 0
+
+    def launch(probe: Probe) -> Future:
+        if probe not in futures:
+            futures[probe] = executor.submit(_probe_api, *probe)
+        return futures[probe]
+
+    def top_up() -> None:
+        nonlocal next_index
+        while next_index < len(plan):
+            in_flight = sum(1 for future in futures.values() if not future.done())
+            if in_flight >= budget:
+                break
+            probe = plan[next_index]
+            if probe not in _negative_cache and probe not in _probe_cache:
+                launch(probe)
+            next_index += 1
+
+    try:
+        probes = next(ladder)
+        plan = build_plan()
+        while True:
+            requested = [launch(probe) for probe in probes]
+            top_up()
+            probes = ladder.send([future.result() for future in requested])
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        cancelled = sum(1 for future in futures.values() if future.cancel())
+        if cancelled:
+            logger.debug(f"🛑 Canceladas {cancelled} sondas especulativas")
+
+
+async def _run_ladder_speculative_async(ladder: Ladder, build_plan: Callable[[], List[Probe]], budget: int) -> List[Book]:
+    """Versión async de `_run_ladder_speculative` (las sondas pendientes se cancelan de verdad)"""
+    tasks: dict[Probe, asyncio.Task] = {}
+    plan: List[Probe] = []
+    next_index = 0
+
+    def launch(probe: Probe) -> asyncio.Task:
+        if probe not in tasks:
+            tasks[probe] = asyncio.ensure_future(_probe_api_async(*probe))
+        return tasks[probe]
+
+    def top_up() -> None:
+        nonlocal next_index
+        while next_index < len(plan):
+            in_flight = sum(1 for task in tasks.values() if not task.done())
+            if in_flight >= budget:
+                break
+            probe = plan[next_index]
+            if probe not in _negative_cache and probe not in _probe_cache:
+                launch(probe)
+            next_index += 1
+
+    try:
+        probes = next(ladder)
+        plan = build_plan()
+        while True:
+            requested = [launch(probe) for probe in probes]
+            top_up()
+            probes = ladder.send(list(await asyncio.gather(*requested)))
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        # Recoger cancelaciones y errores de sondas no consumidas
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        if pending:
+            logger.debug(f"🛑 Canceladas {len(pending)} sondas especulativas")
+
+
+def _availability_probes(books: List[Book], shown: int) -> Tuple[List[Book], List[Probe]]:
+    """
+    Libros mostrados sin dato fresco y las sondas para refrescarlos (por ISBN
+    o título). Se marcan como consultados de antemano: si la sonda no los
+    devuelve (muchas ediciones, ISBN que la API no encuentra) no se vuelven
+    a consultar en cada búsqueda hasta que venza el TTL del overlay.
+    """
+    overlay = get_overlay()
+    stale = overlay.stale(books[:shown])
+    overlay.mark_checked(stale)
+    # El ISBN tal como lo tiene cargado el catálogo (algunos libros solo con ISBN-10)
+    queries = [clean_isbn(book.isbn) if book.isbn else book.title for book in stale]
+    return stale, [(query, AVAILABILITY_PROBE_LIMIT) for query in dict.fromkeys(queries) if query]
+
+
+def _refresh_probe(probe: Probe) -> List[Book]:
+    # Saltea la caché por sonda (TTL largo): lo que se busca es el stock actual
+    return _probe_flight.do(probe, _fetch_and_store_probe, probe)
+
+
+async def _refresh_probe_async(probe: Probe) -> List[Book]:
+    return await _probe_flight_async.do(probe, _fetch_and_store_probe_async, probe)
+
+
+def _with_fresh_availability(books: List[Book], shown: int) -> List[Book]:
+    """
+    Refresca en bloque (sondas en paralelo) el stock/precio de los libros
+    mostrados que no lo tienen fresco en el overlay y retorna los libros
+    con esos valores. Si la API falla se responde con los valores cacheados.
+    """
+    _, probes = _availability_probes(books, shown)
+    if probes:
+        logger.debug(f"🔄 Refrescando stock/precio de {len(probes)} libros")
+        futures = [_get_probe_executor().submit(_refresh_probe, probe) for probe in probes]
+        for future in futures:
+            try:
+                future.result()
+            except httpx.HTTPError as e:
+                logger.warning(f"⚠️ No se pudo refrescar stock/precio: {e}")
+    return get_overlay().apply(books)
+
+
+async def _with_fresh_availability_async(books: List[Book], shown: int) -> List[Book]:
+    """Versión async de `_with_fresh_availability`"""
+    _, probes = _availability_probes(books, shown)
+    if probes:
+        logger.debug(f"🔄 Refrescando stock/precio de {len(probes)} libros")
+        results = await asyncio.gather(*(_refresh_probe_async(probe) for probe in probes), return_exceptions=True)
+        for result in results:
+            if isinstance(result, httpx.HTTPError):
+                logger.warning(f"⚠️ No se pudo refrescar stock/precio: {result}")
+            elif isinstance(result, BaseException):
+                raise result
+    return get_overlay().apply(books)
+
+
+def _search_books_sync(query: str, limit: int, key: str, speculative: Optional[bool], budget: Optional[int]) -> List[Book]:
+    ladder = _search_ladder(query, limit, key)
+    if speculative is None:
+        speculative = SPECULATIVE_FALLBACK
+    if speculative:
+        return _run_ladder_speculative(ladder, partial(_fallback_plan, query, limit), budget or SPECULATIVE_BUDGET)
+    return _run_ladder(ladder)
+
+
+async def _search_books_async(query: str, limit: int, key: str, speculative: Optional[bool], budget: Optional[int]) -> List[Book]:
+    ladder = _search_ladder(query, limit, key)
+    if speculative is None:
+        speculative = SPECULATIVE_FALLBACK
+    if speculative:
+        return await _run_ladder_speculative_async(ladder, partial(_fallback_plan, query, limit), budget or SPECULATIVE_BUDGET)
+    return await _run_ladder_async(ladder)
+
+
+def search_books(
+    query: str,
+    limit: int = 20,
+    speculative: Optional[bool] = None,
+    budget: Optional[int] = None,
+    shown: Optional[int] = None,
+) -> List[Book]:
+    """
+    Búsqueda robusta con fallback y caché:
+    0) Revisar caché
+    0.5) Intentar alias de títulos conocidos (ej: "harry potter 1" -> "piedra filosofal 1")
+    1) Corregir typos y reintentar
+    2) query original
+    3) query simplificada
+    4) keywords + números de serie
+    5) prefijos
+
+    Con `speculative=True` (o SODILIBRO_SPECULATIVE=true) las etapas siguientes
+    se lanzan en paralelo, con hasta `budget` sondas en vuelo; el resultado es
+    idéntico al de la escalera secuencial.
+
+    Llamadas concurrentes con la misma clave de caché esperan a una sola
+    búsqueda en vuelo (single-flight) en lugar de repetirla.
+
+    Los resultados salen de la caché de metadatos (TTL largo) con el stock y
+    precio del overlay de disponibilidad; los primeros `shown` libros (por
+    defecto SODILIBRO_AVAILABILITY_SHOWN) sin dato fresco se refrescan antes.
+    """
+    key = _cache_key(query, limit)
+    books = _search_flight.do(key, _search_books_sync, query, limit, key, speculative, budget)
+    return _with_fresh_availability(list(books), AVAILABILITY_SHOWN if shown is None else shown)
+
+
+async def search_books_async(
+    query: str,
+    limit: int = 20,
+    speculative: Optional[bool] = None,
+    budget: Optional[int] = None,
+    shown: Optional[int] = None,
+) -> List[Book]:
+    """
+    Versión async de `search_books` para servidores asyncio.
+    Recorre la misma escalera de fallback pero cada llamada a la API se hace
+    con `httpx.AsyncClient`, de modo que un worker puede atender muchas
+    conversaciones concurrentes sin bloquear el event loop. Las búsquedas
+    idénticas concurrentes también se agrupan (single-flight).
+    """
+    key = _cache_key(query, limit)
+    books = await _search_flight_async.do(key, _search_books_async, query, limit, key, speculative, budget)
+    return await _with_fresh_availability_async(list(books), AVAILABILITY_SHOWN if shown is None else shown)
+
+
+def use_search_cache(cache: Union[TTLCache, SQLiteCache]) -> None:
+    """
+    Cambia el backend de la caché de búsquedas en tiempo de ejecución, ej:
+    `use_search_cache(SQLiteCache("/var/cache/sodilibro.sqlite3"))`.
+    """
+    global _search_cache
+    _search_cache = cache
+
+
+def cache_stats() -> dict:
+    """Aciertos, fallos, desalojos y tamaño de la caché de búsquedas"""
+    return _search_cache.stats()
+
+
+def negative_cache_stats() -> dict:
+    """Contadores de la caché negativa (queries y sondas sin resultados)"""
+    return _negative_cache.stats()
+
+
+def availability_stats() -> dict:
+    """Contadores del overlay de stock/precio"""
+    return get_overlay().stats()
+
+
+def probe_cache_stats() -> dict:
+    """Contadores de la caché por sonda (resultados crudos de `_call_api`)"""
+    return _probe_cache.stats()
@@ -1,5 +1,9 @@
-from typing import List
+import os
+import logging
+import threading
+from typing import List, Optional
 from .search_engine import normalize
+from .spelling import SymSpell
 from Levenshtein import distance as levenshtein_distance
 
 STOPWORDS = {
@@ -23,6 +27,85 @@ COMMON_WORDS = {
     "rowling", "hermione", "ron", "voldemort", "dumbledore",
 }
 
+logger = logging.getLogger(__name__)
+
+# Vocabulario del corrector de typos: "catalog" (SymSpell sobre el vocabulario
+# del índice del catálogo, si hay uno configurado) o "common" (solo COMMON_WORDS)
+TYPO_VOCABULARY = os.getenv("SODILIBRO_TYPO_VOCABULARY", "catalog").lower()
+# Índice compartido (ver `shared_index`) del que sale el vocabulario
+CATALOG_INDEX_PATH = os.getenv("SODILIBRO_LOCAL_INDEX", "")
+
+# Corrector SymSpell sobre el vocabulario completo (None = solo COMMON_WORDS)
+_typo_corrector: Optional[SymSpell] = None
+_typo_corrector_lock = threading.Lock()
+
+
+def set_typo_corrector(corrector: Optional[SymSpell]) -> None:
+    """
+    Instala el corrector que usan `correct_typo` / `correct_query_typos`
+    cuando no se pasan candidatos. `None` vuelve al escaneo de COMMON_WORDS.
+    """
+    global _typo_corrector
+    _typo_corrector = corrector
+
+
+def get_typo_corrector() -> Optional[SymSpell]:
+    """Corrector instalado (None = COMMON_WORDS); nunca lo construye"""
+    return _typo_corrector
+
+
+def load_typo_corrector() -> Optional[SymSpell]:
+    """
+    Con SODILIBRO_TYPO_VOCABULARY=catalog (por defecto) y un índice en
+    SODILIBRO_LOCAL_INDEX, construye e instala el corrector con el
+    vocabulario de ese índice. Con el catálogo real tarda unos segundos:
+    se llama al arrancar (ver `backends.warm_up`), nunca durante una
+    búsqueda. Si ya hay un corrector instalado no hace nada.
+    """
+    with _typo_corrector_lock:
+        if _typo_corrector is not None or TYPO_VOCABULARY != "catalog" or not CATALOG_INDEX_PATH:
+            return _typo_corrector
+
+        # Import diferido: shared_index -> index -> search_engine
+        from .shared_index import open_shared_index
+
+        try:
+            index, _ = open_shared_index(CATALOG_INDEX_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ No se pudo abrir el índice para el corrector de typos: {e}")
+            return None
+        corrector = use_catalog_vocabulary(index)
+        logger.info(f"🔤 Corrector de typos con el vocabulario del catálogo ({len(corrector)} palabras)")
+        return corrector
+
+
+def use_catalog_vocabulary(index) -> SymSpell:
+    """
+    Construye un corrector SymSpell con el vocabulario de un `CatalogIndex`
+    (más COMMON_WORDS) y lo instala. Retorna el corrector construido.
+    """
+    corrector = SymSpell.from_catalog(index)
+    for word in COMMON_WORDS:
+        corrector.add_word(word)
+    set_typo_corrector(corrector)
+    return corrector
+
+
+def _correct_with_symspell(word: str, corrector: SymSpell) -> str:
+    if word in corrector:
+        return word
+
+    # Mismo criterio que el escaneo lineal: distancia relativa al tamaño,
+    # a igual distancia la palabra más larga y luego la más frecuente
+    matches = [
+        (distance, -len(candidate), -count, candidate)
+        for candidate, distance, count in corrector.lookup(word)
+        if distance < len(word) * 0.4
+    ]
+    if matches:
+        return min(matches)[3]
+    return word
+
 
 def correct_typo(word: str, candidates: set[str] = None) -> str:
     """
@@ -34,8 +117,15 @@ def correct_typo(word: str, candidates: set[str] = None) -> str:
         correct_typo("anbiental") -> "ambiental"
         correct_typo("enpresa") -> "empresa"
         correct_typo("poter") -> "potter"
+
+    Si hay un corrector instalado (ver `get_typo_corrector`) y no se
+    pasan candidatos, se usa SymSpell sobre todo el vocabulario del catálogo
+    (distancia <= 2) en lugar del escaneo lineal.
     """
     if candidates is None:
+        corrector = get_typo_corrector()
+        if corrector is not None:
+            return _correct_with_symspell(word, corrector)
         candidates = COMMON_WORDS
 
     if word in candidates:
@@ -0,0 +1,178 @@
+"""
+Cliente HTTP compartido para la API de SODILIBRO.
+
+Mantiene un único `httpx.Client` con conexiones keep-alive para que todas las
+llamadas de `_call_api` (y todas las etapas de fallback) reutilicen las mismas
+conexiones TCP/TLS en lugar de abrir una nueva por cada consulta.
+Para código asyncio existe el equivalente `get_async_client()`.
+"""
+
+import os
+import atexit
+import asyncio
+import logging
+import weakref
+import threading
+from typing import Optional, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# ⚠️ Certificado SSL inválido en entorno SODILIBRO
+VERIFY_SSL = os.getenv("SODILIBRO_VERIFY_SSL", "false").lower() == "true"
+
+# Parámetros del pool (ajustables por variables de entorno o `configure_client`)
+TIMEOUT = float(os.getenv("SODILIBRO_TIMEOUT", "15"))
+CONNECT_TIMEOUT = float(os.getenv("SODILIBRO_CONNECT_TIMEOUT", str(TIMEOUT)))
+MAX_CONNECTIONS = int(os.getenv("SODILIBRO_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SODILIBRO_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("SODILIBRO_KEEPALIVE_EXPIRY", "30"))
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+_transport: Optional[httpx.BaseTransport] = None
+
+# Un cliente async por event loop (sus conexiones no se pueden compartir entre loops)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+# Tareas que cierran cada cliente async cuando su loop termina
+_async_closers: Set[asyncio.Task] = set()
+_async_transport: Optional[httpx.AsyncBaseTransport] = None
+
+
+def _build_timeout() -> httpx.Timeout:
+    return httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _build_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client() -> httpx.Client:
+    """
+    Retorna el cliente HTTP compartido, creándolo la primera vez.
+    `httpx.Client` es seguro entre hilos, así que se puede usar desde
+    cualquier hilo del proceso.
+    """
+    global _client
+
+    client = _client
+    if client is not None and not client.is_closed:
+        return client
+
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            logger.debug("🔌 Creando cliente HTTP compartido para SODILIBRO")
+            _client = httpx.Client(
+                timeout=_build_timeout(),
+                limits=_build_limits(),
+                verify=VERIFY_SSL,
+                transport=_transport,
+            )
+        return _client
+
+
+def close_client() -> None:
+    """Cierra el cliente compartido y libera las conexiones del pool."""
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def _close_with_loop(client: httpx.AsyncClient) -> None:
+    """
+    Espera hasta que se cancele y entonces cierra `client`: `asyncio.run`
+    cancela las tareas pendientes antes de cerrar el loop.
+    """
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await client.aclose()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Retorna el cliente async compartido del event loop actual. Cada loop
+    (ej: cada `asyncio.run`, o un loop por hilo) tiene su propio cliente,
+    ya que las conexiones no se pueden compartir entre loops; el cliente se
+    cierra solo cuando su loop termina.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None and not client.is_closed:
+        return client
+
+    logger.debug("🔌 Creando cliente HTTP async compartido para SODILIBRO")
+    client = httpx.AsyncClient(
+        timeout=_build_timeout(),
+        limits=_build_limits(),
+        verify=VERIFY_SSL,
+        transport=_async_transport,
+    )
+    closer = loop.create_task(_close_with_loop(client))
+    _async_closers.add(closer)
+    closer.add_done_callback(_async_closers.discard)
+    with _async_clients_lock:
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Cierra el cliente async del event loop actual (llamar al apagar el servidor asyncio)."""
+    with _async_clients_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def configure_client(
+    *,
+    timeout: Optional[float] = None,
+    connect_timeout: Optional[float] = None,
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+    transport: Optional[httpx.BaseTransport] = None,
+    async_transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> None:
+    """
+    Ajusta los parámetros del pool. El cliente actual se cierra y el
+    siguiente `get_client()` crea uno nuevo con la configuración actualizada.
+
+    `transport` / `async_transport` permiten inyectar un transporte propio
+    (ej: `httpx.MockTransport` en tests); pasar `None` restaura el transporte
+    por defecto. Los clientes async existentes se descartan (se cierran al
+    terminar su loop) y se recrean con la nueva configuración en su próximo uso.
+    """
+    global TIMEOUT, CONNECT_TIMEOUT, MAX_CONNECTIONS
+    global MAX_KEEPALIVE_CONNECTIONS, KEEPALIVE_EXPIRY, _transport
+    global _async_transport
+
+    if timeout is not None:
+        TIMEOUT = timeout
+    if connect_timeout is not None:
+        CONNECT_TIMEOUT = connect_timeout
+    if max_connections is not None:
+        MAX_CONNECTIONS = max_connections
+    if max_keepalive_connections is not None:
+        MAX_KEEPALIVE_CONNECTIONS = max_keepalive_connections
+    if keepalive_expiry is not None:
+        KEEPALIVE_EXPIRY = keepalive_expiry
+    _transport = transport
+    _async_transport = async_transport
+
+    close_client()
+    with _async_clients_lock:
+        _async_clients.clear()
+
+
+# Cerrar conexiones al terminar el proceso
+atexit.register(close_client)
@@ -0,0 +1,374 @@
+"""
+Índice invertido del catálogo local.
+
+Mapea cada token normalizado (ver `normalize`) de título, autor y editorial
+a la lista ordenada de posiciones de los libros que lo contienen, más un
+mapa ISBN (10 y 13) -> posiciones. Así la generación de candidatos es un puñado de
+búsquedas en diccionarios, uniones e intersecciones, y el scoring (caro)
+solo corre sobre esos candidatos en lugar de sobre todo el catálogo.
+
+Los autores se indexan además por string normalizado distinto: miles de
+libros comparten el mismo `AUTOR`, así que el fuzzy de autor se calcula
+una sola vez por autor distinto y no una vez por libro.
+
+Para consultas con typos ("jarry poter", "alqimsta") hay además un índice
+de n-gramas de caracteres (`NGramIndex`) sobre el vocabulario de cada campo,
+que encuentra tokens parecidos sin comparar contra todo el vocabulario.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from rapidfuzz import process
+from rapidfuzz.fuzz import ratio
+
+from .isbn import canonical_isbn
+from .models import Book
+from .store import CatalogStore
+from .search_engine import (
+    COMMON_GIVEN_NAMES,
+    author_score_from_best,
+    normalize,
+    significant_words,
+)
+
+FIELDS = ("title", "author", "publisher")
+
+# Similitud mínima (coeficiente de Dice sobre trigramas) por defecto
+NGRAM_CUTOFF = 0.4
+
+
+def char_ngrams(token: str, n: int = 3) -> frozenset:
+    """N-gramas de caracteres del token, con un espacio de relleno a cada lado"""
+    padded = f" {token} "
+    if len(padded) <= n:
+        return frozenset([padded])
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+class NGramIndex:
+    """
+    Índice de n-gramas de caracteres sobre un vocabulario de tokens.
+    `similar` retorna los tokens ordenados por solapamiento de n-gramas
+    (coeficiente de Dice) con la palabra buscada:
+
+        ngrams = NGramIndex(["harry", "potter", "alquimista"])
+        ngrams.similar("poter")  # [("potter", 0.727...)]
+    """
+
+    def __init__(self, tokens: Iterable[str], n: int = 3):
+        self.n = n
+        self.tokens: List[str] = list(dict.fromkeys(tokens))
+        self._sizes: List[int] = []
+        self._grams: Dict[str, List[int]] = {}
+
+        for i, token in enumerate(self.tokens):
+            grams = char_ngrams(token, n)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(i)
+
+    @classmethod
+    def from_parts(cls, tokens: Sequence[str], sizes: Sequence[int], grams: Mapping[str, Sequence[int]], n: int = 3) -> "NGramIndex":
+        """Arma el índice con estructuras ya construidas (ej: vistas de `shared_index`)"""
+        ngrams = cls.__new__(cls)
+        ngrams.n = n
+        ngrams.tokens = tokens
+        ngrams._sizes = sizes
+        ngrams._grams = grams
+        return ngrams
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def similar(self, word: str, cutoff: float = NGRAM_CUTOFF, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Tokens con similitud >= `cutoff`, de más a menos parecido"""
+        grams = char_ngrams(word, self.n)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self._grams.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        size = len(grams)
+        matches = []
+        for i, count in shared.items():
+            similarity = 2 * count / (size + self._sizes[i])
+            if similarity >= cutoff:
+                matches.append((self.tokens[i], similarity))
+
+        matches.sort(key=lambda item: (-item[1], item[0]))
+        return matches[:limit] if limit is not None else matches
+
+
+class CatalogIndex:
+    """
+    Índice invertido sobre una lista de libros. Las posiciones retornadas
+    son índices en `index.books` (un `CatalogStore`) y siempre vienen
+    ordenadas, de modo que los resultados conservan el orden original del
+    catálogo. Los `Book` se crean recién en `books_at`.
+
+        index = CatalogIndex(books)
+        index.match_all("title", ["harry", "potter"])
+        index.books_at(index.find_isbn("9788419087201"))
+    """
+
+    def __init__(self, books: Union[CatalogStore, Iterable[Book]]):
+        self.books = books if isinstance(books, CatalogStore) else CatalogStore.from_books(books)
+        self._postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in FIELDS}
+        self._isbn: Dict[str, List[int]] = {}
+        # Autor normalizado distinto -> posiciones de sus libros
+        self._authors: Dict[str, List[int]] = {}
+        self._author_words: Dict[str, List[str]] = {}
+
+        # Se normaliza cada string distinto del almacén una sola vez, sin crear
+        # `Book` ni pasar por la caché de features del scoring (acotada y
+        # pensada para los libros de las consultas)
+        store = self.books
+        normalized: Dict[int, str] = {0: ""}
+        author_words: Dict[str, List[str]] = {}
+        columns = {field: store.codes(field) for field in FIELDS}
+        isbn_codes = store.codes("isbn")
+
+        for pos in range(len(store)):
+            for field in FIELDS:
+                code = columns[field][pos]
+                text = normalized.get(code)
+                if text is None:
+                    text = normalized[code] = normalize(store.strings[code])
+                postings = self._postings[field]
+                for token in dict.fromkeys(text.split()):
+                    postings.setdefault(token, []).append(pos)
+            # Clave canónica: los ISBN-10 se indexan como su ISBN-13
+            isbn = canonical_isbn(store.strings[isbn_codes[pos]])
+            if isbn:
+                self._isbn.setdefault(isbn, []).append(pos)
+            author = normalized[columns["author"][pos]]
+            words = author_words.get(author)
+            if words is None:
+                words = author_words[author] = significant_words(author)
+            if words:
+                if author not in self._authors:
+                    self._authors[author] = []
+                    self._author_words[author] = words
+                self._authors[author].append(pos)
+
+        # Token de autor -> autores distintos que lo contienen
+        self._author_tokens: Dict[str, List[str]] = {}
+        for author in self._authors:
+            for token in dict.fromkeys(author.split()):
+                self._author_tokens.setdefault(token, []).append(author)
+
+        self._vocab: Dict[str, List[str]] = {field: list(postings) for field, postings in self._postings.items()}
+        self._ngrams: Dict[str, NGramIndex] = {}
+
+    @classmethod
+    def from_parts(
+        cls,
+        books: CatalogStore,
+        postings: Mapping[str, Mapping[str, Sequence[int]]],
+        vocab: Mapping[str, Sequence[str]],
+        isbn: Mapping[str, Sequence[int]],
+        authors: Mapping[str, Sequence[int]],
+        author_words: Mapping[str, List[str]],
+        author_tokens: Mapping[str, Sequence[str]],
+        ngrams: Mapping[str, NGramIndex],
+    ) -> "CatalogIndex":
+        """
+        Arma el índice con estructuras ya construidas en lugar de recorrer el
+        catálogo. Lo usa `shared_index` para montar el índice sobre vistas de
+        un archivo mapeado en memoria (cualquier `Mapping` sirve).
+        """
+        index = cls.__new__(cls)
+        index.books = books
+        index._postings = postings
+        index._vocab = vocab
+        index._isbn = isbn
+        index._authors = authors
+        index._author_words = author_words
+        index._author_tokens = author_tokens
+        index._ngrams = dict(ngrams)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def books_at(self, positions: Iterable[int]) -> List[Book]:
+        return self.books.books(positions)
+
+    def vocabulary(self, field: str) -> List[str]:
+        """Tokens distintos de un campo"""
+        return self._vocab[field]
+
+    def postings(self, field: str, token: str) -> List[int]:
+        """Posiciones de los libros cuyo campo contiene el token exacto"""
+        return self._postings[field].get(token, [])
+
+    def match_all(self, field: str, tokens: Sequence[str]) -> List[int]:
+        """Libros que contienen todos los tokens (intersección, empezando por la lista más corta)"""
+        if not tokens:
+            return []
+        lists = sorted((self.postings(field, token) for token in set(tokens)), key=len)
+        result = set(lists[0])
+        for positions in lists[1:]:
+            if not result:
+                break
+            result.intersection_update(positions)
+        return sorted(result)
+
+    def match_any(self, field: str, tokens: Iterable[str]) -> List[int]:
+        """Libros que contienen al menos uno de los tokens (unión)"""
+        result = set()
+        for token in tokens:
+            result.update(self.postings(field, token))
+        return sorted(result)
+
+    def tokens_containing(self, field: str, fragment: str) -> List[str]:
+        """Tokens del vocabulario que contienen `fragment` como substring"""
+        return [token for token in self._vocab[field] if fragment in token]
+
+    def substring_candidates(self, fields: Sequence[str], word: str) -> List[int]:
+        """
+        Superconjunto de los libros en los que `word` aparece como substring
+        de alguno de los campos (comparado en minúsculas). `normalize` actúa
+        carácter a carácter, así que si `word` está en el texto original,
+        cada trozo de `normalize(word)` está dentro de algún token indexado.
+        El llamador debe verificar la coincidencia exacta sobre el resultado.
+        """
+        pieces = normalize(word).split()
+        if not pieces:
+            return list(range(len(self.books)))
+        fragment = max(pieces, key=len)
+
+        result = set()
+        for field in fields:
+            result.update(self.match_any(field, self.tokens_containing(field, fragment)))
+        return sorted(result)
+
+    def similar_tokens(self, field: str, word: str, threshold: float) -> List[str]:
+        """Tokens del vocabulario con `ratio(word, token) >= threshold`"""
+        return list(self.similar_token_scores(field, word, threshold))
+
+    def similar_token_scores(self, field: str, word: str, threshold: float) -> Dict[str, float]:
+        """Como `similar_tokens`, pero con el ratio de cada token"""
+        matches = process.extract(word, self._vocab[field], scorer=ratio, score_cutoff=threshold, limit=None)
+        return {token: score for token, score, _ in matches}
+
+    def fuzzy_candidates(self, field: str, words: Iterable[str], threshold: float) -> List[int]:
+        """
+        Libros con algún token parecido (`ratio >= threshold`) a alguna de
+        las palabras. Es la condición mínima para que `fuzzy_score_title_words`
+        o `fuzzy_score_author_words` den un score > 0 con ese umbral.
+        """
+        tokens = set()
+        for word in words:
+            tokens.update(self.similar_tokens(field, word, threshold))
+        return self.match_any(field, tokens)
+
+    def authors(self) -> List[str]:
+        """Autores normalizados distintos"""
+        return list(self._authors)
+
+    def author_postings(self, author: str) -> List[int]:
+        """Posiciones de los libros de un autor normalizado"""
+        return self._authors.get(author, [])
+
+    def match_authors(
+        self,
+        query_words: Sequence[str],
+        threshold: float = 75,
+        retry_threshold: Optional[float] = None,
+    ) -> List[int]:
+        """
+        Libros cuyo autor cumple `fuzzy_score_author_words(query_words, ...) >= threshold`.
+        Si no hay ninguno y se pasa `retry_threshold`, se reintenta con ese umbral
+        reutilizando los mismos ratios: una sola pasada fuzzy por autor distinto.
+        """
+        if not query_words:
+            return []
+        lowest = threshold if retry_threshold is None else min(threshold, retry_threshold)
+
+        # Ratio de cada token de autor parecido (>= umbral más bajo) por palabra de la query.
+        # Los ratios por debajo no cuentan en ningún umbral, así que valen 0.
+        token_scores = []
+        authors_by_word = []
+        for word in query_words:
+            scores = self.similar_token_scores("author", word, lowest)
+            token_scores.append(scores)
+            authors_by_word.append({author for token in scores for author in self._author_tokens.get(token, ())})
+
+        # `author_score_from_best` exige que coincidan todas las palabras salvo
+        # nombres propios comunes o iniciales: los autores candidatos son la
+        # intersección de los de esas palabras obligatorias
+        if len(query_words) == 1:
+            required = authors_by_word
+        else:
+            required = [
+                authors for word, authors in zip(query_words, authors_by_word)
+                if len(word) > 3 and word not in COMMON_GIVEN_NAMES
+            ]
+        authors = set.intersection(*required) if required else set.union(*authors_by_word)
+
+        # Mejor ratio de cada palabra de la query contra cada autor (None = coinciden todas)
+        best_by_author = {}
+        for author in authors:
+            author_words = self._author_words[author]
+            if all(qw in author_words for qw in query_words):
+                best_by_author[author] = None
+            else:
+                best_by_author[author] = [max(scores.get(aw, 0) for aw in author_words) for scores in token_scores]
+
+        def matching(limit: float) -> List[int]:
+            positions = []
+            for author, best in best_by_author.items():
+                score = 98 if best is None else author_score_from_best(query_words, best, limit)
+                if score >= limit:
+                    positions.extend(self._authors[author])
+            return sorted(positions)
+
+        result = matching(threshold)
+        if not result and retry_threshold is not None:
+            result = matching(retry_threshold)
+        return result
+
+    def ngram_index(self, field: str) -> NGramIndex:
+        """Índice de n-gramas del vocabulario del campo (se construye al primer uso)"""
+        ngrams = self._ngrams.get(field)
+        if ngrams is None:
+            ngrams = self._ngrams[field] = NGramIndex(self._vocab[field])
+        return ngrams
+
+    def ngram_candidates(
+        self,
+        field: str,
+        words: Sequence[str],
+        cutoff: float = NGRAM_CUTOFF,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Libros ordenados por solapamiento de n-gramas con las palabras: cada
+        palabra aporta la similitud de su token más parecido en el libro y el
+        score es el promedio. Retorna pares (posición, score).
+        """
+        if not words:
+            return []
+
+        ngrams = self.ngram_index(field)
+        scores: Dict[int, float] = {}
+        for word in dict.fromkeys(words):
+            best: Dict[int, float] = {}
+            for token, similarity in ngrams.similar(word, cutoff):
+                for pos in self.postings(field, token):
+                    if similarity > best.get(pos, 0.0):
+                        best[pos] = similarity
+            for pos, similarity in best.items():
+                scores[pos] = scores.get(pos, 0.0) + similarity
+
+        count = len(dict.fromkeys(words))
+        ranked = sorted(((pos, total / count) for pos, total in scores.items()), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def find_isbn(self, isbn: str) -> List[int]:
+        """
+        Libros con ese ISBN exacto (ignorando guiones y espacios), tanto en
+        su forma ISBN-10 como ISBN-13: una sola búsqueda en un dict.
+        """
+        return self._isbn.get(canonical_isbn(isbn), [])
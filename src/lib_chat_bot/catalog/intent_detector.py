@@ -6,6 +6,8 @@ Identifica si la query es para buscar por autor, título, ISBN, categoría, etc.
 import re
 from typing import Literal
 
+from .isbn import is_isbn
+
 QueryIntent = Literal["author", "isbn", "title", "category", "mixed"]
 
 
@@ -22,8 +24,8 @@ def detect_query_intent(query: str) -> QueryIntent:
     """
     query_normalized = query.lower().strip()
 
-    # 1️⃣ Detectar ISBN (10 o 13 dígitos)
-    if re.match(r'^\d{10}(?:\d{3})?$', query_normalized.replace('-', '').replace(' ', '')):
+    # 1️⃣ Detectar ISBN (10 o 13 dígitos; el ISBN-10 puede terminar en X)
+    if is_isbn(query_normalized):
         return "isbn"
 
     # 2️⃣ Detectar patrones conversacionales que implican búsqueda de autor
@@ -0,0 +1,74 @@
+"""
+Normalización y conversión de ISBN-10 / ISBN-13.
+
+Un mismo libro puede llegar como "978-84-08-04517-5", "9788408045175" o su
+ISBN-10 "8408045172" (ej: desde un lector de código de barras).
+`canonical_isbn` los lleva todos a la misma clave (el ISBN-13 sin guiones)
+para indexar y buscar con una sola consulta a un dict.
+"""
+
+import re
+from typing import List
+
+_ISBN_RE = re.compile(r"^(?:\d{9}[\dX]|\d{13})$")
+
+
+def clean_isbn(text: str) -> str:
+    """Quita guiones y espacios (y pasa la X de control a mayúscula)"""
+    return text.replace("-", "").replace(" ", "").strip().upper()
+
+
+def is_isbn(text: str) -> bool:
+    """True si el texto (ya limpio o no) tiene forma de ISBN-10 o ISBN-13"""
+    return bool(_ISBN_RE.match(clean_isbn(text)))
+
+
+def _isbn13_check_digit(first12: str) -> str:
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def _isbn10_check_digit(first9: str) -> str:
+    total = sum(int(d) * (10 - i) for i, d in enumerate(first9))
+    check = (11 - total % 11) % 11
+    return "X" if check == 10 else str(check)
+
+
+def isbn10_to_13(isbn10: str) -> str:
+    """ISBN-10 -> ISBN-13 (prefijo 978, dígito de control recalculado)"""
+    first12 = "978" + clean_isbn(isbn10)[:9]
+    return first12 + _isbn13_check_digit(first12)
+
+
+def isbn13_to_10(isbn13: str) -> str:
+    """ISBN-13 con prefijo 978 -> ISBN-10; los 979 no tienen equivalente y retornan ''"""
+    isbn13 = clean_isbn(isbn13)
+    if not isbn13.startswith("978"):
+        return ""
+    first9 = isbn13[3:12]
+    return first9 + _isbn10_check_digit(first9)
+
+
+def canonical_isbn(text: str) -> str:
+    """
+    Clave canónica de un ISBN: los ISBN-10 se convierten a ISBN-13 y el
+    resto queda en su forma limpia. Otros códigos del catálogo ("L010026")
+    se retornan tal cual (limpios).
+    """
+    isbn = clean_isbn(text)
+    if len(isbn) == 10 and _ISBN_RE.match(isbn):
+        return isbn10_to_13(isbn)
+    return isbn
+
+
+def isbn_forms(text: str) -> List[str]:
+    """
+    Formas a consultar para un ISBN: la limpia tal como llegó y, si existe,
+    su equivalente (ISBN-10 <-> ISBN-13). El catálogo guarda casi todo como
+    ISBN-13, pero algunos libros solo tienen cargado el ISBN-10.
+    """
+    isbn = clean_isbn(text)
+    if not _ISBN_RE.match(isbn):
+        return [isbn]
+    other = isbn10_to_13(isbn) if len(isbn) == 10 else isbn13_to_10(isbn)
+    return [isbn, other] if other else [isbn]
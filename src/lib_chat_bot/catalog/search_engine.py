@@ -1,10 +1,17 @@
+import re
+from dataclasses import dataclass
 from typing import List, Tuple, Optional
 from rapidfuzz.fuzz import ratio, partial_ratio, token_sort_ratio
 from Levenshtein import distance as levenshtein_distance
 
 from .models import Book
+from .cache import TTLCache
+from .availability import current_stock
 from .synonyms import expand_query_with_synonyms, normalize_with_synonyms
-from .intent_detector import detect_query_intent, get_search_priority
+from .intent_detector import QueryIntent, detect_query_intent, get_search_priority
+
+_DIGITS_RE = re.compile(r"\d+")
+_SERIES_NUMBER_RE = re.compile(r"\b(\d+)\b")
 
 
 def normalize(text: str) -> str:
@@ -31,6 +38,11 @@ def normalize(text: str) -> str:
     return text
 
 
+def significant_words(text_norm: str) -> List[str]:
+    """Palabras de más de 2 letras de un texto ya normalizado"""
+    return [w for w in text_norm.split() if len(w) > 2]
+
+
 def extract_title_and_author(query: str) -> Tuple[str, Optional[str]]:
     q = normalize(query)
 
@@ -54,32 +66,48 @@ def fuzzy_score_author(query: str, author: str, threshold: float = 75) -> int:
     if not query or not author:
         return 0
 
-    query_norm = normalize(query)
-    author_norm = normalize(author)
+    return fuzzy_score_author_words(
+        significant_words(normalize(query)),
+        significant_words(normalize(author)),
+        threshold,
+    )
 
-    query_words = [w for w in query_norm.split() if len(w) > 2]
-    author_words = [w for w in author_norm.split() if len(w) > 2]
 
+def fuzzy_score_author_words(query_words: List[str], author_words: List[str], threshold: float = 75) -> int:
+    """`fuzzy_score_author` sobre palabras ya normalizadas (ver `significant_words`)"""
     if not query_words or not author_words:
         return 0
 
-    query_word_count = len(query_words)
-    exact_match_count = sum(1 for qw in query_words if qw in author_words)
-
     # Coincidencia exacta de todas las palabras
-    if exact_match_count == query_word_count:
+    if all(qw in author_words for qw in query_words):
         return 98
 
     # Fuzzy por palabra: mejor match por cada palabra de la query
+    best_scores = [max(ratio(qw, aw) for aw in author_words) for qw in query_words]
+    return author_score_from_best(query_words, best_scores, threshold)
+
+
+COMMON_GIVEN_NAMES = {
+    "jose", "juan", "maria", "luis", "ana", "carlos", "jorge",
+    "marta", "lucia", "pedro", "miguel", "angel", "andres",
+    "silvia", "paula", "paul", "gabriel", "julia", "sara",
+    "isabella", "isabel", "jose", "jaime", "carlos", "diego",
+    "francisco", "fernando", "manuel", "rafael", "alejandro",
+}
+
+
+def author_score_from_best(query_words: List[str], best_scores: List[float], threshold: float = 75) -> int:
+    """
+    Combina el mejor `ratio` de cada palabra de la query contra las palabras
+    del autor (`best_scores[i]` corresponde a `query_words[i]`).
+    Separado para que el scoring por lotes pueda calcular los ratios en matriz.
+    """
+    query_word_count = len(query_words)
+
     matched_count = 0
     total_score = 0
     matched_words = set()
-    for qw in query_words:
-        best = 0
-        for aw in author_words:
-            score = ratio(qw, aw)
-            if score > best:
-                best = score
+    for qw, best in zip(query_words, best_scores):
         if best >= threshold:
             matched_count += 1
             total_score += best
@@ -95,15 +123,8 @@ def fuzzy_score_author(query: str, author: str, threshold: float = 75) -> int:
         return int(avg_score)
 
     unmatched_words = [w for w in query_words if w not in matched_words]
-    common_given_names = {
-        "jose", "juan", "maria", "luis", "ana", "carlos", "jorge",
-        "marta", "lucia", "pedro", "miguel", "angel", "andres",
-        "silvia", "paula", "paul", "gabriel", "julia", "sara",
-        "isabella", "isabel", "jose", "jaime", "carlos", "diego",
-        "francisco", "fernando", "manuel", "rafael", "alejandro",
-    }
     if matched_count >= 1 and unmatched_words:
-        if all(len(w) <= 3 or w in common_given_names for w in unmatched_words):
+        if all(len(w) <= 3 or w in COMMON_GIVEN_NAMES for w in unmatched_words):
             avg_score = total_score / matched_count
             return int(avg_score * 0.9)
 
@@ -123,12 +144,15 @@ def fuzzy_score_title(query: str, title: str, threshold: float = 70) -> int:
     if not query or not title:
         return 0
 
-    query_norm = normalize(query)
-    title_norm = normalize(title)
+    return fuzzy_score_title_words(
+        significant_words(normalize(query)),
+        significant_words(normalize(title)),
+        threshold,
+    )
 
-    query_words = [w for w in query_norm.split() if len(w) > 2]
-    title_words = [w for w in title_norm.split() if len(w) > 2]
 
+def fuzzy_score_title_words(query_words: List[str], title_words: List[str], threshold: float = 70) -> int:
+    """`fuzzy_score_title` sobre palabras ya normalizadas (ver `significant_words`)"""
     if not query_words or not title_words:
         return 0
 
@@ -160,8 +184,16 @@ def fuzzy_score(a: str, b: str) -> int:
 
     # Calcular distancia Levenshtein para detectar typos
     # Normalizar primero
-    a_norm = normalize(a)
-    b_norm = normalize(b)
+    return fuzzy_score_prepared(a, normalize(a), b, normalize(b))
+
+
+def fuzzy_score_prepared(a: str, a_norm: str, b: str, b_norm: str) -> int:
+    """
+    `fuzzy_score` con las formas normalizadas ya calculadas
+    (`a_norm == normalize(a)`, `b_norm == normalize(b)`).
+    """
+    if not a or not b:
+        return 0
 
     # ⚠️ NO comparar palabras que tengan muy diferente longitud
     # Esto evita que "alquimista" matchee con "quimica"
@@ -186,7 +218,37 @@ def fuzzy_score(a: str, b: str) -> int:
     )
 
 
-def score_book(book: Book, query: str) -> int:
+# Palabras de la serie Harry Potter que no cuentan como "palabras únicas" (typos)
+SERIES_COMMON_WORDS = {"harry", "potter", "piedra", "filosofal"}
+TITLE_STOPWORDS = {"el", "la", "los", "las", "de", "del", "y", "un", "una", "autor"}
+
+
+@dataclass(frozen=True)
+class QueryContext:
+    """
+    Todo el trabajo de `score_book` que depende solo de la query (intent,
+    pesos, normalización, números, keywords). Se construye una vez por
+    `rerank_books` en lugar de una vez por libro.
+    """
+    query: str
+    intent: QueryIntent
+    priority: dict[str, float]
+    title_q: Optional[str]
+    author_q: Optional[str]
+    normalized_query: str
+    original_unique_words: Tuple[str, ...]
+    query_numbers: frozenset[str]
+    query_keywords: frozenset[str]
+    long_keywords: Tuple[str, ...]
+    isbn_query: str
+    # Formas ya normalizadas para `fuzzy_score_prepared` / `fuzzy_score_author_words`
+    normalized_query_clean: str
+    author_query_words: List[str]
+    title_q_norm: str
+    author_q_norm: str
+
+
+def build_query_context(query: str) -> QueryContext:
     # Detectar intent de la búsqueda PRIMERO
     intent = detect_query_intent(query)
     priority = get_search_priority(intent)
@@ -201,26 +263,191 @@ def score_book(book: Book, query: str) -> int:
     # Normalizar primero
     normalized_query = normalize(query)
 
+    # Palabras "únicas" de la query (posibles typos como "jarry")
+    original_words = set(normalized_query.split())
+    original_unique_words = tuple(w for w in original_words if len(w) > 3 and w not in SERIES_COMMON_WORDS)
+
+    # Keywords del título buscado (sin stopwords básicas)
+    query_keywords = set()
+    if title_q:
+        query_keywords = {w for w in title_q.split() if w and w not in TITLE_STOPWORDS}
+
+    return QueryContext(
+        query=query,
+        intent=intent,
+        priority=priority,
+        title_q=title_q,
+        author_q=author_q,
+        normalized_query=normalized_query,
+        original_unique_words=original_unique_words,
+        query_numbers=frozenset(_DIGITS_RE.findall(normalized_query)),
+        query_keywords=frozenset(query_keywords),
+        long_keywords=tuple(w for w in query_keywords if len(w) >= 6),
+        isbn_query=normalized_query.replace("-", "").replace(" ", ""),
+        normalized_query_clean=normalize(normalized_query),
+        author_query_words=significant_words(normalized_query),
+        title_q_norm=normalize(title_q) if title_q else "",
+        author_q_norm=normalize(author_q) if author_q else "",
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class BookFeatures:
+    """
+    Campos de un libro ya normalizados y tokenizados para el scoring.
+    Se calculan una vez por libro (al cargar el catálogo o la primera vez que
+    se ve) y los reutilizan todas las funciones de scoring.
+
+    Para cada campo se guarda `normalize(campo)` y `normalize(normalize(campo))`
+    (que solo difiere por espacios en los extremos), porque `fuzzy_score`
+    compara ambas formas.
+    """
+    title: str
+    title_clean: str
+    author: str
+    author_clean: str
+    publisher: str
+    publisher_clean: str
+    category: str
+    category_clean: str
+    description: str
+    description_clean: str
+    title_words: frozenset[str]
+    long_title_words: Tuple[str, ...]
+    author_words: List[str]
+    title_numbers: frozenset[str]
+    series_number: int
+    isbn_clean: Optional[str]
+    edition_priority: int
+
+
+BOOK_FEATURES_CACHE_SIZE = 50000
+_book_features_cache = TTLCache(max_entries=BOOK_FEATURES_CACHE_SIZE, ttl=None)
+
+
+def _edition_priority(title_text: str) -> int:
+    # 📏 Priorización de ediciones y penalización de spin-offs
+    # 1. Edición estándar (título simple, sin sufijos): 50 puntos
+    # 2. Edición ILUSTRADO: 15 puntos
+    # 3. Edición especial con "AÑO X" (MINALIMA): 10 puntos
+    # 4. Ediciones con descripciones largas: 5 puntos
+    # Penalización: Spin-offs y ediciones derivadas: -50 puntos
+
+    title_upper = title_text.upper()
+
+    edition_priority = 0
+
+    # Detectar spin-offs y ediciones secundarias (PENALIZACIÓN)
+    # Estos son libros que mencionan el título principal pero no son el libro principal
+    spin_off_indicators = [
+        "NAVIDAD EN", "DE HARRY POTTER", "DEL UNIVERSO DE",
+        "FRAGMENTO", "COMPANION", "GUIA", "GUIDE", "COLORING",
+        "ANIMALES FANTASTICOS", "MARAVILLAS DE LA NATURALEZA"
+    ]
+
+    if any(indicator in title_upper for indicator in spin_off_indicators):
+        edition_priority = -50  # Penalización fuerte para spin-offs
+
+    # Detectar edición MINALIMA (tiene "AÑO" en el título) o descripciones largas
+    elif any(phrase in title_text for phrase in ["Diseño e ilustraciones", "diseño", "ilustraciones de MINALIMA"]):
+        edition_priority = 5  # Cuarta prioridad
+    elif "AÑO" in title_upper or "ANO" in title_upper:
+        edition_priority = 10  # Tercera prioridad
+    # Detectar edición ILUSTRADO (segunda prioridad)
+    elif "ILUSTRADO" in title_upper:
+        edition_priority = 15  # Segunda prioridad
+    # Detectar otras ediciones especiales
+    elif any(word in title_upper for word in ["T/D", "TAPA DURA", "EDICION"]):
+        edition_priority = 8  # Entre ILUSTRADO y AÑO
+    # Título simple (estándar) - MÁXIMA PRIORIDAD
+    else:
+        edition_priority = 50  # Primera prioridad (máxima)
+
+    return edition_priority
+
+
+def _series_number(title: str) -> int:
+    match = _SERIES_NUMBER_RE.search(title or "")
+    return int(match.group(1)) if match else 10**9
+
+
+def compute_book_features(book: Book) -> BookFeatures:
+    """Calcula las features de un libro (sin caché)"""
     title = normalize(book.title or "")
     author = normalize(book.author or "")
     publisher = normalize(book.publisher or "")
     category = normalize(book.category or "")
     description = normalize(book.description or "")
 
+    title_words = frozenset(title.split())
+
+    return BookFeatures(
+        title=title,
+        title_clean=normalize(title),
+        author=author,
+        author_clean=normalize(author),
+        publisher=publisher,
+        publisher_clean=normalize(publisher),
+        category=category,
+        category_clean=normalize(category),
+        description=description,
+        description_clean=normalize(description),
+        title_words=title_words,
+        long_title_words=tuple(w for w in title_words if len(w) > 3),
+        author_words=significant_words(author),
+        title_numbers=frozenset(_DIGITS_RE.findall(title)),
+        series_number=_series_number(book.title),
+        isbn_clean=book.isbn.replace("-", "").replace(" ", "") if book.isbn else None,
+        edition_priority=_edition_priority(book.title or ""),
+    )
+
+
+def get_book_features(book: Book) -> BookFeatures:
+    """
+    Features cacheadas por id + hash del contenido: si el libro cambia
+    (ej: otro título con el mismo id) se recalculan.
+    """
+    key = (book.id, hash((book.title, book.author, book.publisher, book.category, book.description, book.isbn)))
+    features = _book_features_cache.get(key)
+    if features is None:
+        features = compute_book_features(book)
+        _book_features_cache[key] = features
+    return features
+
+
+def score_book(book: Book, query: str) -> int:
+    """Compatibilidad: puntúa un libro construyendo el contexto de la query"""
+    return score_book_with_context(book, build_query_context(query))
+
+
+def score_book_with_context(book: Book, ctx: QueryContext) -> int:
+    """Puntúa un libro; solo hace el trabajo que depende del libro"""
+    intent = ctx.intent
+    priority = ctx.priority
+    title_q = ctx.title_q
+    author_q = ctx.author_q
+    normalized_query = ctx.normalized_query
+    normalized_query_clean = ctx.normalized_query_clean
+
+    features = get_book_features(book)
+    title = features.title
+    author = features.author
+    publisher = features.publisher
+    category = features.category
+    description = features.description
+
     score = 0
 
     # Preparar palabras para análisis
-    original_words = set(normalized_query.split())
-    title_words = set(title.split())
-    original_unique_words = [w for w in original_words if len(w) > 3 and w not in {"harry", "potter", "piedra", "filosofal"}]
+    title_words = features.title_words
+    original_unique_words = ctx.original_unique_words
 
 
     # 🔢 PRIMERO: Bonus crítico para números en serie (Harry Potter 1, 2, 3, etc.)
     # Pero SOLO si el typo/palabra no es la palabra dominante de la query
     # Si hay typos como "jarry" o "poter", esos typos tienen más peso que el número
-    import re
-    query_numbers = set(re.findall(r'\d+', normalized_query))
-    title_numbers = set(re.findall(r'\d+', title))
+    query_numbers = ctx.query_numbers
+    title_numbers = features.title_numbers
 
     # Si la query tiene palabras únicas (typos), la prioridad es la coincidencia del typo, no del número
     has_unique_words = any(original_unique_words)
@@ -247,30 +474,32 @@ def score_book(book: Book, query: str) -> int:
     # Si la query tiene palabras únicas como "jarry" que no sean comunes, dar bonus si están similares en el título
     if original_unique_words:  # Si hay palabras únicas/typos en la query
         for orig_word in original_unique_words:
-            for title_word in title_words:
-                if len(title_word) > 3:
-                    # Búsqueda 1: Distancia Levenshtein directa (palabras similares)
-                    lev_dist = levenshtein_distance(orig_word, title_word)
-                    if lev_dist <= max(1, len(orig_word) * 0.3):
-                        score += 250
-                    # Búsqueda 2: Substring fuzzy (palabra dentro de palabra con pequeña distancia)
-                    # Ej: "poter" dentro de "jarripoter"
-                    elif orig_word in title_word:
-                        score += 200
-                    elif any(orig_word[i:i+4] in title_word for i in range(len(orig_word)-3)):
-                        # Buscar substrings de 4+ caracteres del typo dentro del título
-                        score += 150
+            for title_word in features.long_title_words:
+                # Búsqueda 1: Distancia Levenshtein directa (palabras similares)
+                lev_dist = levenshtein_distance(orig_word, title_word)
+                if lev_dist <= max(1, len(orig_word) * 0.3):
+                    score += 250
+                # Búsqueda 2: Substring fuzzy (palabra dentro de palabra con pequeña distancia)
+                # Ej: "poter" dentro de "jarripoter"
+                elif orig_word in title_word:
+                    score += 200
+                elif any(orig_word[i:i+4] in title_word for i in range(len(orig_word)-3)):
+                    # Buscar substrings de 4+ caracteres del typo dentro del título
+                    score += 150
 
     # 🎯 SCORING POR CAMPOS según intent detectado
 
     # Autor - dar MUCHO mayor peso si intent es "author"
-    author_match_author = fuzzy_score_author(normalized_query, author)
+    author_match_author = (
+        fuzzy_score_author_words(ctx.author_query_words, features.author_words)
+        if normalized_query and author else 0
+    )
     if intent == "author":
         # Para búsqueda de autor, usar fuzzy_score_author (compara palabras clave)
         author_match = author_match_author
     else:
         # Para búsquedas normales, usar fuzzy_score estándar
-        author_match = fuzzy_score(normalized_query, author)
+        author_match = fuzzy_score_prepared(normalized_query, normalized_query_clean, author, features.author_clean)
 
     if intent == "author":
         # BÚSQUEDA SELECTIVA: Si el autor NO coincide bien, penalizar SEVERAMENTE
@@ -288,7 +517,7 @@ def score_book(book: Book, query: str) -> int:
             score += int(author_match_author * 1.5)
 
     # Título
-    title_match = fuzzy_score(normalized_query, title)
+    title_match = fuzzy_score_prepared(normalized_query, normalized_query_clean, title, features.title_clean)
 
     # Si intent es "author", IGNORAR completamente el título para scoring
     # No buscamos por título cuando el usuario busca por autor
@@ -300,29 +529,25 @@ def score_book(book: Book, query: str) -> int:
         score += int(title_match * 3 * priority["title"])
 
     # Categoría - dar mayor peso si intent es "category"
-    category_match = fuzzy_score(normalized_query, category)
+    category_match = fuzzy_score_prepared(normalized_query, normalized_query_clean, category, features.category_clean)
     score += int(category_match * 1.5 * priority["category"])
 
     # Descripción - peso menor
-    description_match = fuzzy_score(normalized_query, description)
+    description_match = fuzzy_score_prepared(normalized_query, normalized_query_clean, description, features.description_clean)
     score += int(description_match * 0.5 * priority["description"])
 
     # ISBN - si intent es ISBN, dar máximo peso
     if priority.get("isbn", 0) > 0 and book.isbn:
-        isbn_normalized = book.isbn.replace("-", "").replace(" ", "")
-        query_normalized_isbn = normalized_query.replace("-", "").replace(" ", "")
+        isbn_normalized = features.isbn_clean
+        query_normalized_isbn = ctx.isbn_query
         if query_normalized_isbn in isbn_normalized or isbn_normalized in query_normalized_isbn:
             score += 1000  # Máximo bonus para coincidencia ISBN exacta
 
     # Si el título tiene todos los términos principales de la query
     # (Solo aplicar si title_q no es None)
-    query_keywords = set()
-    title_words = set(title.split())
+    query_keywords = ctx.query_keywords
 
     if title_q:
-        query_words = set(title_q.split())
-        stopwords_basic = {"el", "la", "los", "las", "de", "del", "y", "un", "una", "autor"}
-        query_keywords = {w for w in query_words if w and w not in stopwords_basic}
         common_keywords = query_keywords & title_words
         if len(common_keywords) > 0:
             coverage = len(common_keywords) / len(query_keywords) if query_keywords else 0
@@ -339,7 +564,7 @@ def score_book(book: Book, query: str) -> int:
     # Evita que palabras como "alquimista" se confundan con "quimica"
     # (Solo si es búsqueda de título)
     if title_q and author_match_author < 80:
-        long_keywords = [w for w in query_keywords if len(w) >= 6]
+        long_keywords = ctx.long_keywords
         if long_keywords:
             for kw in long_keywords:
                 matched = False
@@ -354,71 +579,38 @@ def score_book(book: Book, query: str) -> int:
                     score -= 400
 
 
-    # 📏 Priorización de ediciones y penalización de spin-offs
-    # 1. Edición estándar (título simple, sin sufijos): 50 puntos
-    # 2. Edición ILUSTRADO: 15 puntos
-    # 3. Edición especial con "AÑO X" (MINALIMA): 10 puntos
-    # 4. Ediciones con descripciones largas: 5 puntos
-    # Penalización: Spin-offs y ediciones derivadas: -50 puntos
-
-    title_text = book.title or ""
-    title_upper = title_text.upper()
-
-    edition_priority = 0
-
-    # Detectar spin-offs y ediciones secundarias (PENALIZACIÓN)
-    # Estos son libros que mencionan el título principal pero no son el libro principal
-    spin_off_indicators = [
-        "NAVIDAD EN", "DE HARRY POTTER", "DEL UNIVERSO DE",
-        "FRAGMENTO", "COMPANION", "GUIA", "GUIDE", "COLORING",
-        "ANIMALES FANTASTICOS", "MARAVILLAS DE LA NATURALEZA"
-    ]
-
-    if any(indicator in title_upper for indicator in spin_off_indicators):
-        edition_priority = -50  # Penalización fuerte para spin-offs
-
-    # Detectar edición MINALIMA (tiene "AÑO" en el título) o descripciones largas
-    elif any(phrase in title_text for phrase in ["Diseño e ilustraciones", "diseño", "ilustraciones de MINALIMA"]):
-        edition_priority = 5  # Cuarta prioridad
-    elif "AÑO" in title_upper or "ANO" in title_upper:
-        edition_priority = 10  # Tercera prioridad
-    # Detectar edición ILUSTRADO (segunda prioridad)
-    elif "ILUSTRADO" in title_upper:
-        edition_priority = 15  # Segunda prioridad
-    # Detectar otras ediciones especiales
-    elif any(word in title_upper for word in ["T/D", "TAPA DURA", "EDICION"]):
-        edition_priority = 8  # Entre ILUSTRADO y AÑO
-    # Título simple (estándar) - MÁXIMA PRIORIDAD
-    else:
-        edition_priority = 50  # Primera prioridad (máxima)
-
-    score += edition_priority
+    score += features.edition_priority
 
     # ✍️ Autor/Editorial
     if author_q:
         author_score = max(
-            fuzzy_score(author_q, author),
-            fuzzy_score(author_q, publisher),
+            fuzzy_score_prepared(author_q, ctx.author_q_norm, author, features.author_clean),
+            fuzzy_score_prepared(author_q, ctx.author_q_norm, publisher, features.publisher_clean),
         )
         score += int(author_score * 1.5 * priority["author"])
 
     # 📚 Categoría (peso ajustable según intent)
-    category_score = fuzzy_score(title_q, category)
+    category_score = fuzzy_score_prepared(title_q, ctx.title_q_norm, category, features.category_clean)
     score += int(category_score * 0.5 * priority["category"])
 
     # 📖 Descripción como último recurso (peso ajustable según intent)
-    desc_score = fuzzy_score(title_q, description)
+    desc_score = fuzzy_score_prepared(title_q, ctx.title_q_norm, description, features.description_clean)
     score += int(desc_score * 0.3 * priority["description"])
 
-    # 📊 Bonus por stock disponible
-    if book.stock and book.stock > 0:
-        score += min(book.stock * 1.5, 15)  # Máximo bonus de 15 puntos
+    # 📊 Bonus por stock disponible (stock vigente del overlay de disponibilidad)
+    stock = current_stock(book)
+    if stock and stock > 0:
+        score += min(stock * 1.5, 15)  # Máximo bonus de 15 puntos
 
     return int(score)
 
 
 def rerank_books(books: List[Book], query: str, boost_ids: Optional[set] = None) -> List[Book]:
-    scored = [(score_book(book, query), book) for book in books]
+    # Import diferido: batch_scoring depende de este módulo
+    from .batch_scoring import score_books_batch
+
+    ctx = build_query_context(query)
+    scored = list(zip(score_books_batch(books, ctx).tolist(), books))
 
     # Si hay IDs para boostear (libros del alias), les damos +500 puntos extra
     if boost_ids:
@@ -429,20 +621,28 @@ def rerank_books(books: List[Book], query: str, boost_ids: Optional[set] = None)
 
     # Si la query NO tiene número, ordenar por número ascendente cuando
     # la mayoría de resultados parecen ser de un mismo autor con numeración.
-    import re
-    query_numbers = re.findall(r"\d+", query)
+    query_numbers = _DIGITS_RE.findall(query)
 
-    def series_number(title: str) -> int:
-        match = re.search(r"\b(\d+)\b", title or "")
-        return int(match.group(1)) if match else 10**9
+    def series_number(book: Book) -> int:
+        return get_book_features(book).series_number
 
     if not query_numbers:
         series_author_count = 0
+        # Muchos libros comparten autor: un solo fuzzy por autor distinto
+        author_scores = {}
         for _, book in scored:
-            if series_number(book.title) != 10**9 and fuzzy_score_author(query, book.author or "") >= 80:
+            features = get_book_features(book)
+            if features.series_number == 10**9 or not query or not book.author:
+                continue
+            author_score = author_scores.get(features.author)
+            if author_score is None:
+                author_score = author_scores[features.author] = fuzzy_score_author_words(
+                    ctx.author_query_words, features.author_words
+                )
+            if author_score >= 80:
                 series_author_count += 1
         if series_author_count >= 3:
-            scored.sort(key=lambda x: (series_number(x[1].title), -x[0]))
+            scored.sort(key=lambda x: (series_number(x[1]), -x[0]))
         else:
             scored.sort(key=lambda x: x[0], reverse=True)
     else:
@@ -0,0 +1,371 @@
+"""
+Índice del catálogo en un archivo mapeable en memoria, compartido entre procesos.
+
+Cada worker que arma su propio `CatalogIndex` paga la carga y la indexación
+y guarda una copia privada de todo. Con `write_shared_index` el catálogo
+(columnas de `CatalogStore`) y sus índices (postings por campo, ISBN,
+autores, n-gramas) se escriben una sola vez como arrays planos; cada worker
+lo abre con `mmap` en modo lectura y arma el índice sobre vistas del
+archivo, sin copiar nada: todos los procesos comparten las mismas páginas
+del page cache del sistema operativo.
+
+Formato del archivo:
+
+    MAGIC | largo del header (uint64) | header JSON | secciones
+
+El header guarda la versión, el hash de la planilla fuente y, por sección,
+(offset, largo en bytes, typecode). Cada sección es un array plano
+alineado a 8 bytes. Las tablas de strings son un blob UTF-8 más un array de
+offsets; las de claves van ordenadas (el orden de bytes UTF-8 coincide con
+el de `str`) para buscar con búsqueda binaria. Un mapa clave -> posiciones
+son claves + offsets + datos.
+
+    index = load_shared_index(CATALOG_FILE)   # construye el archivo si hace falta
+"""
+
+import os
+import json
+import mmap
+import struct
+import logging
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .index import FIELDS, CatalogIndex, NGramIndex
+from .snapshot import file_hash, load_catalog_store
+from .store import TEXT_FIELDS, CatalogStore
+
+logger = logging.getLogger(__name__)
+
+SHARED_INDEX_VERSION = 1
+SHARED_INDEX_SUFFIX = ".index"
+
+_MAGIC = b"SDLIDX\x00\x01"
+_HEADER_LEN = struct.Struct("<Q")
+_ALIGN = 8
+
+PathLike = Union[str, Path]
+
+
+def default_shared_index_path(source: PathLike) -> Path:
+    """El índice vive junto a la planilla: `SDLLista14nov2025.index`"""
+    return Path(source).with_suffix(SHARED_INDEX_SUFFIX)
+
+
+# ---------------------------------------------------------------------------
+# Vistas de solo lectura sobre el archivo mapeado
+# ---------------------------------------------------------------------------
+
+class _StringTable(Sequence[str]):
+    """Tabla de strings: se decodifica cada string recién al accederlo"""
+
+    def __init__(self, blob: memoryview, offsets: memoryview):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def _bytes(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._bytes(i).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._bytes(i).decode("utf-8")
+
+    def find(self, value: str) -> int:
+        """Posición del string en una tabla ordenada (-1 si no está)"""
+        key = value.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self._bytes(lo) == key else -1
+
+
+class _PostingsMap(Mapping[str, List[int]]):
+    """
+    Mapa clave -> lista de enteros. Si se pasa `values`, los enteros se
+    traducen a los strings de esa tabla (ej: token de autor -> autores).
+    """
+
+    def __init__(self, keys: _StringTable, offsets: memoryview, data: memoryview, values: Optional[_StringTable] = None):
+        self.keys_table = keys
+        self._offsets = offsets
+        self._data = data
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self.keys_table)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys_table)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self.keys_table.find(key) >= 0
+
+    def at(self, i: int) -> list:
+        items = self._data[self._offsets[i]:self._offsets[i + 1]].tolist()
+        if self._values is not None:
+            return [self._values[item] for item in items]
+        return items
+
+    def __getitem__(self, key: str) -> list:
+        i = self.keys_table.find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self.at(i)
+
+    def get(self, key: str, default=None):
+        i = self.keys_table.find(key)
+        return self.at(i) if i >= 0 else default
+
+
+class _AuthorWords(Mapping[str, List[str]]):
+    """Autor normalizado -> sus palabras significativas (guardadas separadas por espacio)"""
+
+    def __init__(self, authors: _StringTable, words: _StringTable):
+        self._authors = authors
+        self._words = words
+
+    def __len__(self) -> int:
+        return len(self._authors)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._authors)
+
+    def __getitem__(self, author: str) -> List[str]:
+        i = self._authors.find(author)
+        if i < 0:
+            raise KeyError(author)
+        return self._words[i].split()
+
+
+class _LazyVocabulary(Mapping[str, List[str]]):
+    """
+    Vocabulario por campo. `process.extract` recorre la lista completa en
+    cada consulta, así que se decodifica a una lista una vez por proceso
+    (y por campo) en el primer uso, no al abrir el índice.
+    """
+
+    def __init__(self, tables: Dict[str, _StringTable]):
+        self._tables = tables
+        self._lists: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tables)
+
+    def __getitem__(self, field: str) -> List[str]:
+        vocab = self._lists.get(field)
+        if vocab is None:
+            vocab = self._lists[field] = list(self._tables[field])
+        return vocab
+
+
+# ---------------------------------------------------------------------------
+# Escritura
+# ---------------------------------------------------------------------------
+
+class _Writer:
+    """Junta las secciones (arrays planos) y las escribe alineadas"""
+
+    def __init__(self):
+        self.sections: List[Tuple[str, str, bytes]] = []
+
+    def add(self, name: str, typecode: str, data) -> None:
+        if not isinstance(data, array) or data.typecode != typecode:
+            data = array(typecode, data)
+        self.sections.append((name, typecode, data.tobytes()))
+
+    def add_strings(self, name: str, strings: Sequence[str]) -> None:
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = array("Q", [0])
+        total = 0
+        for item in encoded:
+            total += len(item)
+            offsets.append(total)
+        self.sections.append((f"{name}.blob", "B", b"".join(encoded)))
+        self.add(f"{name}.offsets", "Q", offsets)
+
+    def add_postings(self, name: str, postings: Mapping[str, Sequence[int]], keys: Sequence[str], translate: Optional[Dict[str, int]] = None) -> None:
+        """`keys` ordenadas; `translate` convierte los valores (strings) a enteros"""
+        offsets = array("Q", [0])
+        data = array("I")
+        for key in keys:
+            values = postings[key]
+            if translate is not None:
+                values = [translate[value] for value in values]
+            data.extend(values)
+            offsets.append(len(data))
+        self.add_strings(f"{name}.keys", keys)
+        self.add(f"{name}.offsets", "Q", offsets)
+        self.add(f"{name}.data", "I", data)
+
+    def write(self, path: PathLike, source_hash: str) -> None:
+        layout = {}
+        offset = 0
+        for name, typecode, data in self.sections:
+            layout[name] = [offset, len(data), typecode]
+            offset += len(data) + (-len(data)) % _ALIGN
+
+        header = json.dumps({
+            "version": SHARED_INDEX_VERSION,
+            "source_hash": source_hash,
+            "sections": layout,
+        }).encode("utf-8")
+        start = len(_MAGIC) + _HEADER_LEN.size + len(header)
+        header += b" " * ((-start) % _ALIGN)
+
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            for _, _, data in self.sections:
+                f.write(data)
+                f.write(b"\x00" * ((-len(data)) % _ALIGN))
+        os.replace(tmp_path, path)
+
+
+def write_shared_index(index: CatalogIndex, path: PathLike, source_hash: str = "") -> None:
+    """Guarda el catálogo y todos los índices de `index` en el formato mapeable (escritura atómica)"""
+    writer = _Writer()
+
+    store = index.books
+    writer.add_strings("strings", store.strings)
+    writer.add("ids", "q", store.ids)
+    writer.add("stock", "q", store.stock)
+    writer.add("price", "d", store.price)
+    for field in TEXT_FIELDS:
+        writer.add(f"column.{field}", "I", store.codes(field))
+
+    for field in FIELDS:
+        postings = index._postings[field]
+        vocab = sorted(postings)
+        writer.add_postings(f"postings.{field}", postings, vocab)
+
+        # N-gramas sobre el mismo vocabulario ordenado (los ids de token son sus posiciones)
+        ngrams = NGramIndex(vocab)
+        writer.add(f"ngrams.{field}.sizes", "I", ngrams._sizes)
+        writer.add_postings(f"ngrams.{field}.grams", ngrams._grams, sorted(ngrams._grams))
+
+    writer.add_postings("isbn", index._isbn, sorted(index._isbn))
+
+    authors = sorted(index._authors)
+    author_ids = {author: i for i, author in enumerate(authors)}
+    writer.add_postings("authors", index._authors, authors)
+    writer.add_strings("author_words", [" ".join(index._author_words[author]) for author in authors])
+    writer.add_postings("author_tokens", index._author_tokens, sorted(index._author_tokens), translate=author_ids)
+
+    writer.write(path, source_hash)
+
+
+# ---------------------------------------------------------------------------
+# Lectura
+# ---------------------------------------------------------------------------
+
+def _read_sections(path: PathLike) -> Tuple[dict, Dict[str, memoryview]]:
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if bytes(view[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError(f"{path} no es un índice compartido del catálogo")
+    (header_len,) = _HEADER_LEN.unpack_from(view, len(_MAGIC))
+    start = len(_MAGIC) + _HEADER_LEN.size
+    header = json.loads(bytes(view[start:start + header_len]))
+    if header.get("version") != SHARED_INDEX_VERSION:
+        raise ValueError(f"Versión de índice compartido no soportada: {header.get('version')}")
+
+    base = start + header_len
+    sections = {}
+    for name, (offset, length, typecode) in header["sections"].items():
+        section = view[base + offset:base + offset + length]
+        sections[name] = section if typecode == "B" else section.cast(typecode)
+    return header, sections
+
+
+def open_shared_index(path: PathLike) -> Tuple[CatalogIndex, str]:
+    """
+    Abre el índice mapeado en memoria y retorna (índice, hash de la fuente).
+    El `CatalogIndex` y su `CatalogStore` son de solo lectura.
+    """
+    header, sections = _read_sections(path)
+
+    def strings(name: str) -> _StringTable:
+        return _StringTable(sections[f"{name}.blob"], sections[f"{name}.offsets"])
+
+    def postings(name: str, values: Optional[_StringTable] = None) -> _PostingsMap:
+        return _PostingsMap(strings(f"{name}.keys"), sections[f"{name}.offsets"], sections[f"{name}.data"], values)
+
+    store = CatalogStore.from_views(
+        strings("strings"),
+        sections["ids"],
+        sections["stock"],
+        sections["price"],
+        {field: sections[f"column.{field}"] for field in TEXT_FIELDS},
+    )
+
+    field_postings = {field: postings(f"postings.{field}") for field in FIELDS}
+    vocab = _LazyVocabulary({field: field_postings[field].keys_table for field in FIELDS})
+    ngrams = {
+        field: NGramIndex.from_parts(
+            field_postings[field].keys_table,
+            sections[f"ngrams.{field}.sizes"],
+            postings(f"ngrams.{field}.grams"),
+        )
+        for field in FIELDS
+    }
+
+    authors = postings("authors")
+    index = CatalogIndex.from_parts(
+        books=store,
+        postings=field_postings,
+        vocab=vocab,
+        isbn=postings("isbn"),
+        authors=authors,
+        author_words=_AuthorWords(authors.keys_table, strings("author_words")),
+        author_tokens=postings("author_tokens", values=authors.keys_table),
+        ngrams=ngrams,
+    )
+    return index, header["source_hash"]
+
+
+def load_shared_index(source: PathLike, path: Optional[PathLike] = None) -> CatalogIndex:
+    """
+    Abre el índice compartido si está al día con la planilla (mismo hash);
+    si no existe o quedó viejo, lo reconstruye (desde el snapshot) y lo abre.
+    Varios workers pueden arrancar a la vez: la escritura es atómica.
+    """
+    path = Path(path) if path else default_shared_index_path(source)
+    source_hash = file_hash(source)
+
+    if path.exists():
+        try:
+            index, index_hash = open_shared_index(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Índice compartido ilegible o de otra versión, se reconstruye: {e}")
+        else:
+            if index_hash == source_hash:
+                return index
+            logger.info("🔄 La planilla cambió, reconstruyendo índice compartido del catálogo")
+
+    index = CatalogIndex(load_catalog_store(source))
+    write_shared_index(index, path, source_hash)
+    logger.info(f"💾 Índice compartido del catálogo guardado en {path} ({len(index)} libros)")
+    return open_shared_index(path)[0]
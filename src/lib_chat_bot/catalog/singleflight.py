@@ -0,0 +1,95 @@
+"""
+Deduplicación "single-flight" de peticiones concurrentes.
+
+Si varios llamadores piden la misma clave a la vez (ej: decenas de chats
+buscando "harry potter 1" en el mismo segundo), solo el primero ejecuta la
+función; el resto espera y recibe el mismo resultado (o la misma excepción).
+Hay una versión para hilos (`SingleFlight`) y otra para asyncio
+(`AsyncSingleFlight`).
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Single-flight para código sync (seguro entre hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._flights[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+
+
+class _AsyncFlight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight para asyncio. La función compartida corre en su propia
+    tarea: si un llamador se cancela, los demás siguen esperando el resultado;
+    solo cuando no queda nadie esperando se cancela la tarea.
+    """
+
+    def __init__(self):
+        # Las tareas pertenecen a un event loop: un registro por loop
+        self._flights_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        flights = self._flights_by_loop.setdefault(asyncio.get_running_loop(), {})
+
+        flight = flights.get(key)
+        if flight is None:
+            flight = _AsyncFlight(asyncio.ensure_future(fn(*args)))
+            flights[key] = flight
+
+            def forget(task, key=key, flight=flight):
+                if flights.get(key) is flight:
+                    del flights[key]
+                # Marcar la excepción como recuperada aunque nadie quede esperando
+                if not task.cancelled():
+                    task.exception()
+
+            flight.task.add_done_callback(forget)
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
@@ -0,0 +1,189 @@
+"""
+Snapshot binario del catálogo local.
+
+Leer `SDLLista14nov2025.xlsx` con pandas y construir los `Book` fila a fila
+tarda segundos en cada arranque. `build_snapshot` convierte la planilla una
+sola vez en un archivo columnar compacto (las columnas de `CatalogStore`: una
+tabla de strings distintos más arrays de códigos) y `load_catalog_store` lo
+carga en milisegundos, reconstruyéndolo solo cuando cambia el hash del
+archivo fuente.
+
+Paso de build (también lo hace `load_catalog` automáticamente):
+
+    python -m lib_chat_bot.catalog.snapshot SDLLista14nov2025.xlsx
+"""
+
+import os
+import re
+import sys
+import pickle
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .models import Book
+from .store import CatalogStore
+
+logger = logging.getLogger(__name__)
+
+# v2: ids estables derivados de `Cod. Item` (ver `book_id_from_code`)
+# v3: columnas de `CatalogStore` (todos los campos de `Book`)
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = ".snapshot"
+
+PathLike = Union[str, Path]
+
+# Códigos del catálogo: una letra + número ("L010006", "P010028")
+_ITEM_CODE_RE = re.compile(r"^([A-Za-z])(\d{1,7})$")
+_HASHED_ID_OFFSET = 10 ** 9
+
+
+def file_hash(path: PathLike) -> str:
+    """SHA-256 del contenido del archivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_snapshot_path(source: PathLike) -> Path:
+    """El snapshot vive junto a la planilla: `SDLLista14nov2025.snapshot`"""
+    return Path(source).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def book_id_from_code(code: str) -> int:
+    """
+    Id estable de un libro a partir de su `Cod. Item`, igual en todos los
+    procesos (a diferencia de `hash()`, que cambia en cada arranque).
+
+    Los códigos letra + número se convierten directamente: la letra ocupa
+    las posiciones altas (A-Z = 1-26, a-z = 27-52) y el número las bajas,
+    ej: "L010006" -> 120010006. Cualquier otro código usa un hash estable
+    (blake2b) en un rango aparte (>= 10**9) para que no choquen.
+    """
+    code = code.strip()
+    match = _ITEM_CODE_RE.match(code)
+    if match:
+        letter, number = match.groups()
+        letter_value = ord(letter) - ord("A") + 1 if letter.isupper() else ord(letter) - ord("a") + 27
+        return letter_value * 10 ** 7 + int(number)
+
+    digest = hashlib.blake2b(code.encode("utf-8"), digest_size=8).digest()
+    return _HASHED_ID_OFFSET + int.from_bytes(digest, "big") % _HASHED_ID_OFFSET
+
+
+def read_catalog_excel(source: PathLike) -> List[Book]:
+    """Lee la planilla del catálogo (lento: solo para construir el snapshot)"""
+    import pandas as pd
+
+    df = pd.read_excel(source)
+    books: List[Book] = []
+
+    for row in df.to_dict("records"):
+        numeric_id = book_id_from_code(str(row["Cod. Item"]))
+        title = row["TITULO"] if pd.notna(row["TITULO"]) else ""
+        author = row["AUTOR"] if pd.notna(row["AUTOR"]) else None
+        publisher = row["EDITORIAL"] if pd.notna(row["EDITORIAL"]) else None
+        isbn = row["ISBN"] if pd.notna(row["ISBN"]) else None
+
+        if not title:
+            continue
+
+        books.append(
+            Book(
+                id=numeric_id,
+                title=str(title),
+                author=str(author) if author else None,
+                publisher=str(publisher) if publisher else None,
+                isbn=str(isbn) if isbn else None,
+                stock=int(row["Existencia"]) if pd.notna(row["Existencia"]) else 0,
+            )
+        )
+
+    return books
+
+
+def write_snapshot(books: Union[CatalogStore, List[Book]], path: PathLike, source_hash: str = "") -> None:
+    """Guarda el catálogo en formato columnar (escritura atómica)"""
+    store = books if isinstance(books, CatalogStore) else CatalogStore.from_books(books)
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "source_hash": source_hash,
+        **store.to_columns(),
+    }
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_store(path: PathLike) -> Tuple[CatalogStore, str]:
+    """Carga un snapshot como `CatalogStore` (sin crear ningún `Book`); retorna (store, hash de la fuente)"""
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Versión de snapshot no soportada: {data.get('version')}")
+    return CatalogStore.from_columns(data), data["source_hash"]
+
+
+def read_snapshot(path: PathLike) -> Tuple[List[Book], str]:
+    """Carga un snapshot como lista de `Book`; retorna (libros, hash de la fuente)"""
+    store, source_hash = read_snapshot_store(path)
+    return store.to_books(), source_hash
+
+
+def build_snapshot(source: PathLike, snapshot_path: Optional[PathLike] = None) -> Path:
+    """Convierte la planilla en un snapshot y retorna su ruta"""
+    snapshot_path = Path(snapshot_path) if snapshot_path else default_snapshot_path(source)
+    books = read_catalog_excel(source)
+    write_snapshot(books, snapshot_path, file_hash(source))
+    logger.info(f"💾 Snapshot del catálogo guardado en {snapshot_path} ({len(books)} libros)")
+    return snapshot_path
+
+
+def load_catalog_store(source: PathLike, snapshot_path: Optional[PathLike] = None) -> CatalogStore:
+    """
+    Carga el catálogo desde el snapshot si está al día con la planilla
+    (mismo hash); si no existe o quedó viejo, lo reconstruye desde el Excel.
+    """
+    snapshot_path = Path(snapshot_path) if snapshot_path else default_snapshot_path(source)
+    source_hash = file_hash(source)
+
+    if snapshot_path.exists():
+        try:
+            store, snapshot_hash = read_snapshot_store(snapshot_path)
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+            logger.warning(f"⚠️ Snapshot ilegible o de otra versión, se reconstruye: {e}")
+        else:
+            if snapshot_hash == source_hash:
+                return store
+            logger.info("🔄 La planilla cambió, reconstruyendo snapshot del catálogo")
+
+    store = CatalogStore.from_books(read_catalog_excel(source))
+    write_snapshot(store, snapshot_path, source_hash)
+    return store
+
+
+def load_catalog(source: PathLike, snapshot_path: Optional[PathLike] = None) -> List[Book]:
+    """Como `load_catalog_store`, pero retorna la lista completa de `Book`"""
+    return load_catalog_store(source, snapshot_path).to_books()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Construye el snapshot binario del catálogo")
+    parser.add_argument("source", help="Planilla del catálogo (.xlsx)")
+    parser.add_argument("-o", "--output", help="Ruta del snapshot (por defecto junto a la planilla)")
+    args = parser.parse_args(argv)
+
+    path = build_snapshot(args.source, args.output)
+    print(f"✅ Snapshot guardado en {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
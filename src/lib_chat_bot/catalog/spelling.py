@@ -0,0 +1,111 @@
+"""
+Corrector de typos SymSpell sobre el vocabulario del catálogo.
+
+En lugar de comparar la palabra contra todo el vocabulario, se precalculan
+los "borrados" (la palabra sin 1..`max_distance` letras) de cada término.
+Dos palabras a distancia de edición <= d comparten algún borrado de a lo
+sumo d letras, así que una consulta solo genera los borrados de la palabra
+buscada, los busca en el diccionario y calcula la distancia real sobre ese
+puñado de candidatos. Los borrados se calculan sobre un prefijo de
+`prefix_length` letras para acotar la memoria, como en SymSpell.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from Levenshtein import distance as levenshtein_distance
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """La palabra y todas sus variantes con hasta `max_distance` letras borradas"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {term[:i] + term[i + 1:] for term in frontier for i in range(len(term))} - result
+        result |= frontier
+    return result
+
+
+class SymSpell:
+    """
+    Diccionario de borrados con frecuencias por término.
+
+        speller = SymSpell.from_frequencies({"ambiental": 120, "potter": 14})
+        speller.lookup("anbiental")  # [("ambiental", 1, 120)]
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words: Dict[str, int] = {}
+        self._deletes: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_frequencies(cls, frequencies: Mapping[str, int], **kwargs) -> "SymSpell":
+        speller = cls(**kwargs)
+        for word, count in frequencies.items():
+            speller.add_word(word, count)
+        return speller
+
+    @classmethod
+    def from_words(cls, words: Iterable[str], **kwargs) -> "SymSpell":
+        """Construye el diccionario contando cuántas veces aparece cada palabra"""
+        speller = cls(**kwargs)
+        for word in words:
+            speller.add_word(word)
+        return speller
+
+    @classmethod
+    def from_catalog(cls, index, fields: Tuple[str, ...] = ("title", "author"), min_length: int = 3, **kwargs) -> "SymSpell":
+        """
+        Construye el diccionario desde un `CatalogIndex`: cada token alfabético
+        de al menos `min_length` letras, con su frecuencia en número de libros.
+        """
+        speller = cls(**kwargs)
+        for field in fields:
+            for token in index.vocabulary(field):
+                if len(token) >= min_length and token.isalpha():
+                    speller.add_word(token, len(index.postings(field, token)))
+        return speller
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
+
+    def add_word(self, word: str, count: int = 1) -> None:
+        if not word:
+            return
+        if word in self.words:
+            self.words[word] += count
+            return
+        self.words[word] = count
+        for deleted in _deletes(word[:self.prefix_length], self.max_distance):
+            self._deletes.setdefault(deleted, []).append(word)
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """
+        Términos a distancia de Levenshtein <= `max_distance` de la palabra,
+        como (término, distancia, frecuencia), de menor a mayor distancia y,
+        a igual distancia, de mayor a menor frecuencia.
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        candidates = set()
+        for deleted in _deletes(word[:self.prefix_length], max_distance):
+            candidates.update(self._deletes.get(deleted, ()))
+
+        matches = []
+        for candidate in candidates:
+            if abs(len(candidate) - len(word)) > max_distance:
+                continue
+            distance = levenshtein_distance(word, candidate, score_cutoff=max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, distance, self.words[candidate]))
+
+        matches.sort(key=lambda match: (match[1], -match[2], -len(match[0]), match[0]))
+        return matches
@@ -0,0 +1,246 @@
+"""
+Caché persistente en SQLite (modo WAL) compartida por los workers de un host.
+
+Tiene la misma interfaz que `TTLCache` (get/set, `in`, `[]`, stats...), así
+que `client.search_books` puede usarla en su lugar. Guarda listas de `Book`
+serializadas en JSON con su expiración, de modo que sobrevive a reinicios y
+los aciertos de un worker sirven a todos los demás.
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Union
+
+from .models import Book
+
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+def _encode_key(key: Hashable) -> str:
+    return json.dumps(key, ensure_ascii=False)
+
+
+def _encode_value(value: Any) -> str:
+    if isinstance(value, list) and all(isinstance(v, Book) for v in value):
+        return json.dumps({"books": [book.model_dump() for book in value]}, ensure_ascii=False)
+    return json.dumps({"value": value}, ensure_ascii=False)
+
+
+def _decode_value(raw: str) -> Any:
+    data = json.loads(raw)
+    if "books" in data:
+        return [Book.model_validate(item) for item in data["books"]]
+    return data["value"]
+
+
+class SQLiteCache:
+    """
+    Caché LRU aproximada con TTL sobre un archivo SQLite.
+    Cada hilo usa su propia conexión; la concurrencia entre procesos la
+    resuelve SQLite (WAL permite lectores concurrentes con un escritor).
+    Los contadores (hits, misses...) son por proceso.
+
+    Para que las lecturas no compitan por el único escritor de SQLite, un
+    acierto solo actualiza el último acceso si tiene más de `touch_interval`
+    segundos (por defecto una décima parte del TTL), y el límite de entradas
+    se revisa cada `evict_every` escrituras de este proceso (por defecto el
+    1% de `max_entries`), así que puede excederse en esa cantidad un rato.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 10000,
+        ttl: Optional[float] = 300,
+        clock: Callable[[], float] = time.time,
+        touch_interval: Optional[float] = None,
+        evict_every: Optional[int] = None,
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if touch_interval is None:
+            touch_interval = ttl / 10 if ttl else 60.0
+        self.touch_interval = touch_interval
+        self.evict_every = evict_every or max(1, max_entries // 100)
+        self._writes = 0
+        # Reloj de pared: las expiraciones se comparten entre procesos
+        self._clock = clock
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        conn = self._conn()
+        with conn:
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna el valor si existe y no expiró (y actualiza su último acceso si es viejo)"""
+        encoded = _encode_key(key)
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (encoded,)
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return default
+
+        raw, expires_at, accessed_at = row
+        now = self._clock()
+        if expires_at is not None and expires_at <= now:
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (encoded,))
+            self._count("expirations")
+            self._count("misses")
+            return default
+        if now - accessed_at >= self.touch_interval:
+            with conn:
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, encoded))
+
+        self._count("hits")
+        return _decode_value(raw)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        """Guarda un valor; `ttl` permite sobrescribir el TTL por defecto para esta entrada"""
+        if ttl is _MISSING:
+            ttl = self.ttl
+        now = self._clock()
+        expires_at = now + ttl if ttl is not None else None
+
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (_encode_key(key), _encode_value(value), expires_at, now),
+            )
+            if self._due_for_eviction():
+                self._evict(conn, now)
+
+    def _due_for_eviction(self) -> bool:
+        """True cada `evict_every` escrituras (evita un COUNT(*) por cada `set`)"""
+        with self._stats_lock:
+            self._writes += 1
+            if self._writes < self.evict_every:
+                return False
+            self._writes = 0
+            return True
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count <= self.max_entries:
+            return
+
+        # Primero descartar lo expirado, luego lo menos usado recientemente
+        expired = conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self._count("expirations", expired)
+
+        excess = count - expired - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self._count("evictions", excess)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (_encode_key(key),))
+        return value
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Contadores para dimensionar la caché (entradas compartidas, contadores por proceso)"""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "path": self.path,
+            }
+
+    def close(self) -> None:
+        """Cierra la conexión del hilo actual"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        conn = self._conn()
+        with conn:
+            deleted = conn.execute("DELETE FROM cache WHERE key = ?", (_encode_key(key),)).rowcount
+        if not deleted:
+            raise KeyError(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """No cuenta como acierto/fallo; solo indica si hay una entrada vigente"""
+        row = self._conn().execute(
+            "SELECT expires_at FROM cache WHERE key = ?", (_encode_key(key),)
+        ).fetchone()
+        if row is None:
+            return False
+        return row[0] is None or row[0] > self._clock()
+
+    def __len__(self) -> int:
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()
+        return count
@@ -0,0 +1,184 @@
+"""
+Almacén compacto del catálogo local.
+
+En lugar de miles de `Book` de pydantic (cada uno con su propio dict y sus
+strings de autor/editorial repetidos), el catálogo se guarda en columnas:
+una tabla de strings internados compartida y, por campo de texto, un
+`array` de enteros con el código de su string (0 = sin valor). Ids, stock y
+precio van en arrays numéricos.
+
+Los `Book` se crean solo en el borde (API, resultados), bajo demanda:
+
+    store = CatalogStore.from_books(books)
+    store.text("author", 0)        # sin crear ningún Book
+    store.books([0, 5, 9])         # Books solo para los resultados
+"""
+
+import math
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union, overload
+
+from pydantic import TypeAdapter
+
+from .models import Book
+
+# Campos de texto de `Book` (todos opcionales salvo el título)
+TEXT_FIELDS = ("title", "author", "publisher", "category", "subcategory", "isbn", "description")
+
+# Marca de "sin stock informado" en la columna de stock
+_NO_STOCK = -(2 ** 63)
+
+_BOOK_LIST = TypeAdapter(List[Book])
+
+
+class CatalogStore(Sequence[Book]):
+    """
+    Catálogo columnar. Se indexa como una lista de `Book` (`store[i]`,
+    `len(store)`, iteración), pero cada acceso crea el `Book` en el momento;
+    en el camino caliente conviene usar `text` / `codes` directamente.
+    """
+
+    def __init__(self):
+        # Tabla de strings internados; el código 0 es "sin valor"
+        self.strings: List[str] = [""]
+        self._string_codes: Dict[str, int] = {"": 0}
+        self.ids = array("q")
+        self.stock = array("q")
+        self.price = array("d")
+        self.columns: Dict[str, array] = {field: array("I") for field in TEXT_FIELDS}
+
+    @classmethod
+    def from_books(cls, books: Iterable[Book]) -> "CatalogStore":
+        store = cls()
+        for book in books:
+            store.append(book)
+        return store
+
+    @classmethod
+    def from_columns(cls, data: dict) -> "CatalogStore":
+        """Reconstruye el almacén desde `to_columns()` (sin copiar los arrays)"""
+        store = cls()
+        store.strings = data["strings"]
+        store._string_codes = {value: code for code, value in enumerate(store.strings)}
+        store.ids = data["ids"]
+        store.stock = data["stock"]
+        store.price = data["price"]
+        store.columns = {field: data[field] for field in TEXT_FIELDS}
+        return store
+
+    @classmethod
+    def from_views(cls, strings: Sequence[str], ids, stock, price, columns: Dict[str, Sequence[int]]) -> "CatalogStore":
+        """
+        Almacén de solo lectura sobre columnas ya existentes (ej: vistas de un
+        archivo mapeado en memoria). La tabla inversa string -> código se arma
+        recién si se llama a `code_of`.
+        """
+        store = cls()
+        store.strings = strings
+        store._string_codes = None
+        store.ids = ids
+        store.stock = stock
+        store.price = price
+        store.columns = dict(columns)
+        return store
+
+    def to_columns(self) -> dict:
+        """Columnas en tipos simples (arrays y lista de strings), aptas para pickle"""
+        return {
+            "strings": self.strings,
+            "ids": self.ids,
+            "stock": self.stock,
+            "price": self.price,
+            **self.columns,
+        }
+
+    def intern(self, value: Optional[str]) -> int:
+        """Código del string en la tabla (lo agrega si no estaba)"""
+        if not value:
+            return 0
+        code = self._string_codes.get(value)
+        if code is None:
+            code = self._string_codes[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return code
+
+    def append(self, book: Book) -> int:
+        """Agrega un libro y retorna su posición"""
+        self.ids.append(book.id)
+        self.stock.append(_NO_STOCK if book.stock is None else book.stock)
+        self.price.append(math.nan if book.price is None else book.price)
+        for field in TEXT_FIELDS:
+            self.columns[field].append(self.intern(getattr(book, field)))
+        return len(self.ids) - 1
+
+    def replace(self, pos: int, book: Book) -> None:
+        """Reemplaza el libro de una posición (los demás no se tocan)"""
+        self.ids[pos] = book.id
+        self.stock[pos] = _NO_STOCK if book.stock is None else book.stock
+        self.price[pos] = math.nan if book.price is None else book.price
+        for field in TEXT_FIELDS:
+            self.columns[field][pos] = self.intern(getattr(book, field))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def text(self, field: str, pos: int) -> Optional[str]:
+        """Valor de un campo de texto (None si no tiene)"""
+        code = self.columns[field][pos]
+        return self.strings[code] if code else None
+
+    def codes(self, field: str) -> array:
+        """Columna de códigos de un campo (para filtrar por igualdad sin comparar strings)"""
+        return self.columns[field]
+
+    def code_of(self, value: str) -> int:
+        """Código de un string ya internado (0 si no aparece en el catálogo)"""
+        if self._string_codes is None:
+            self._string_codes = {string: code for code, string in enumerate(self.strings)}
+        return self._string_codes.get(value, 0)
+
+    def _row(self, pos: int) -> dict:
+        stock = self.stock[pos]
+        price = self.price[pos]
+        row = {field: self.text(field, pos) for field in TEXT_FIELDS}
+        row["title"] = row["title"] or ""
+        row["id"] = self.ids[pos]
+        row["stock"] = None if stock == _NO_STOCK else stock
+        row["price"] = None if math.isnan(price) else price
+        return row
+
+    def book(self, pos: int) -> Book:
+        """Crea el `Book` de una posición"""
+        return Book.model_validate(self._row(pos))
+
+    def books(self, positions: Iterable[int]) -> List[Book]:
+        """Crea los `Book` de varias posiciones de una vez"""
+        return _BOOK_LIST.validate_python([self._row(pos) for pos in positions])
+
+    def to_books(self) -> List[Book]:
+        return self.books(range(len(self)))
+
+    @overload
+    def __getitem__(self, pos: int) -> Book: ...
+
+    @overload
+    def __getitem__(self, pos: slice) -> List[Book]: ...
+
+    def __getitem__(self, pos: Union[int, slice]) -> Union[Book, List[Book]]:
+        if isinstance(pos, slice):
+            return self.books(range(*pos.indices(len(self))))
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError(pos)
+        return self.book(pos)
+
+    def __iter__(self) -> Iterator[Book]:
+        for pos in range(len(self)):
+            yield self.book(pos)
+
+    def nbytes(self) -> int:
+        """Memoria aproximada de las columnas y la tabla de strings"""
+        arrays = [self.ids, self.stock, self.price, *self.columns.values()]
+        return sum(a.itemsize * len(a) for a in arrays) + sum(sys.getsizeof(s) for s in self.strings)
@@ -0,0 +1,205 @@
+"""
+Espejo local completo del catálogo de SODILIBRO.
+
+`_call_api` solo pide la primera página de cada búsqueda, así que el
+catálogo nunca está completo en local. `sync_mirror` recorre el endpoint
+`vwitemTienda` página a página (`offset` / `limit`, con hasta `workers`
+páginas en vuelo) y guarda el resultado en el formato de `snapshot`, listo
+para `CatalogIndex` / `shared_index` y `LocalIndexBackend`.
+
+La re-sincronización es incremental: se compara cada libro con la fila que
+ya tenía el espejo y solo se reescriben las filas que cambiaron (las demás
+conservan su posición y sus códigos); si nada cambió, el archivo no se toca.
+
+    python -m lib_chat_bot.catalog.sync catalogo.snapshot --index catalogo.index
+"""
+
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .models import Book
+from .store import CatalogStore
+from .http_client import get_client
+from .client import BASE_URL, _build_params, _parse_books
+from .snapshot import read_snapshot_store, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+SYNC_PAGE_SIZE = int(os.getenv("SODILIBRO_SYNC_PAGE_SIZE", "500"))
+SYNC_WORKERS = int(os.getenv("SODILIBRO_SYNC_WORKERS", "4"))
+# Fracción máxima del espejo que una sincronización incremental puede dar de baja
+SYNC_MAX_REMOVED = float(os.getenv("SODILIBRO_SYNC_MAX_REMOVED", "0.2"))
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class SyncStats:
+    """Resultado de una sincronización"""
+    total: int
+    added: int
+    updated: int
+    removed: int
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+def fetch_page(offset: int, limit: int) -> Tuple[List[Book], Optional[int]]:
+    """Una página del catálogo completo; retorna (libros, total informado por la API o None)"""
+    response = get_client().get(BASE_URL, params=_build_params("", limit, offset))
+    response.raise_for_status()
+
+    data = response.json()
+    return _parse_books(data), data.get("count")
+
+
+def fetch_catalog(page_size: int = SYNC_PAGE_SIZE, workers: int = SYNC_WORKERS) -> List[Book]:
+    """
+    Descarga el catálogo completo. Si la API informa el total (`count`) se
+    piden todas las páginas restantes con a lo sumo `workers` en vuelo; si
+    no, se piden de a tandas de `workers` hasta la primera página incompleta.
+    Un libro repetido entre páginas (el catálogo cambió durante la descarga)
+    queda con su última versión.
+    """
+    first, count = fetch_page(0, page_size)
+    # La API puede recortar el `limit` pedido: el tamaño real es el de la primera
+    # página. Sin `count` no se sabe si el catálogo es más chico que una página,
+    # así que se asume el recorte (a lo sumo cuesta una tanda de páginas vacías)
+    if first and len(first) < page_size and (count is None or count > len(first)):
+        page_size = len(first)
+
+    pages = [first]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sodilibro-sync") as executor:
+        def fetch(offset: int) -> List[Book]:
+            return fetch_page(offset, page_size)[0]
+
+        if count is not None:
+            pages.extend(executor.map(fetch, range(page_size, count, page_size)))
+        else:
+            offset = page_size
+            last = first
+            while len(last) == page_size:
+                wave = list(executor.map(fetch, range(offset, offset + workers * page_size, page_size)))
+                for page in wave:
+                    pages.append(page)
+                    last = page
+                    if len(page) < page_size:
+                        break
+                offset += workers * page_size
+
+    books: Dict[int, Book] = {}
+    for page in pages:
+        for book in page:
+            books[book.id] = book
+    logger.info(f"📥 Descargados {len(books)} libros del catálogo en {len(pages)} páginas")
+    return list(books.values())
+
+
+def apply_changes(store: CatalogStore, books: List[Book]) -> Tuple[CatalogStore, SyncStats]:
+    """
+    Aplica el catálogo descargado sobre el espejo: reescribe solo las filas
+    que cambiaron y agrega las nuevas al final. Si hay libros dados de baja
+    se compacta el almacén (conservando el orden de los que quedan).
+    """
+    positions = {book_id: pos for pos, book_id in enumerate(store.ids)}
+    fresh_ids = {book.id for book in books}
+
+    added = updated = 0
+    for book in books:
+        pos = positions.get(book.id)
+        if pos is None:
+            store.append(book)
+            added += 1
+        elif store._row(pos) != book.model_dump():
+            store.replace(pos, book)
+            updated += 1
+
+    removed = sum(1 for book_id in positions if book_id not in fresh_ids)
+    if removed:
+        kept = [pos for pos, book_id in enumerate(store.ids) if book_id in fresh_ids]
+        store = CatalogStore.from_books(store.books(kept))
+
+    return store, SyncStats(total=len(store), added=added, updated=updated, removed=removed)
+
+
+def sync_mirror(
+    path: PathLike,
+    full: bool = False,
+    page_size: int = SYNC_PAGE_SIZE,
+    workers: int = SYNC_WORKERS,
+    max_removed: float = SYNC_MAX_REMOVED,
+) -> SyncStats:
+    """
+    Sincroniza el espejo en `path` (formato `snapshot`). Con `full=True`, o
+    si el espejo no existe o es ilegible, se arma desde cero. El "hash de la
+    fuente" del snapshot registra la fecha de la última sincronización.
+
+    Si una sincronización incremental daría de baja más de `max_removed`
+    (fracción) del espejo, se asume una descarga incompleta y no se escribe
+    nada; para aceptar una baja masiva real hay que usar `full=True`.
+    """
+    path = Path(path)
+    books = fetch_catalog(page_size, workers)
+    if not books:
+        # Una respuesta vacía no debe borrar el espejo existente
+        raise RuntimeError("La API no devolvió ningún libro; el espejo no se modifica")
+
+    store = CatalogStore()
+    if not full and path.exists():
+        try:
+            store, _ = read_snapshot_store(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Espejo ilegible, se sincroniza desde cero: {e}")
+            store = CatalogStore()
+
+    previous = len(store)
+    store, stats = apply_changes(store, books)
+    if previous and stats.removed > max_removed * previous:
+        raise RuntimeError(
+            f"La sincronización daría de baja {stats.removed} de {previous} libros "
+            f"(más del {max_removed:.0%}); el espejo no se modifica (usar full=True si es real)"
+        )
+    if stats.changed:
+        write_snapshot(store, path, source_hash=f"sync:{datetime.now(timezone.utc).isoformat()}")
+        logger.info(
+            f"💾 Espejo actualizado en {path}: {stats.added} nuevos, "
+            f"{stats.updated} modificados, {stats.removed} dados de baja"
+        )
+    else:
+        logger.info(f"✅ Espejo al día ({stats.total} libros), sin cambios")
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sincroniza el espejo local del catálogo de SODILIBRO")
+    parser.add_argument("output", help="Ruta del espejo (formato snapshot)")
+    parser.add_argument("--full", action="store_true", help="Reconstruir desde cero en lugar de incremental")
+    parser.add_argument("--index", help="Además, escribir el índice compartido en esta ruta")
+    parser.add_argument("--page-size", type=int, default=SYNC_PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS)
+    args = parser.parse_args(argv)
+
+    stats = sync_mirror(args.output, full=args.full, page_size=args.page_size, workers=args.workers)
+    print(f"✅ {stats.total} libros: {stats.added} nuevos, {stats.updated} modificados, {stats.removed} dados de baja")
+
+    if args.index and (stats.changed or not Path(args.index).exists()):
+        from .index import CatalogIndex
+        from .shared_index import write_shared_index
+
+        store, source_hash = read_snapshot_store(args.output)
+        write_shared_index(CatalogIndex(store), args.index, source_hash)
+        print(f"✅ Índice compartido guardado en {args.index}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 import pandas as pd
 from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.snapshot import book_id_from_code
 from lib_chat_bot.catalog.search_engine import score_book, rerank_books
 from lib_chat_bot.catalog.intent_detector import detect_query_intent
 
@@ -13,7 +14,7 @@ df = pd.read_excel(Path(__file__).parent / 'SDLLista14nov2025.xlsx')
 books_data = []
 for idx, row in df.iterrows():
     id_str = str(row['Cod. Item'])
-    numeric_id = abs(hash(id_str)) % (10 ** 9)
+    numeric_id = book_id_from_code(id_str)
     title = row['TITULO'] if pd.notna(row['TITULO']) else ''
     author = row['AUTOR'] if pd.notna(row['AUTOR']) else None
     publisher = row['EDITORIAL'] if pd.notna(row['EDITORIAL']) else None
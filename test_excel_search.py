@@ -9,6 +9,7 @@ sys.path.insert(0, str(project_root / "src"))
 
 from lib_chat_bot.catalog.search_engine import score_book, rerank_books
 from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.snapshot import book_id_from_code
 
 # Leer la base de datos de Excel
 df = pd.read_excel(project_root / 'SDLLista14nov2025.xlsx')
@@ -18,7 +19,7 @@ books_data = []
 for idx, row in df.iterrows():
     # Crear un ID numérico desde el string
     id_str = str(row['Cod. Item'])
-    numeric_id = abs(hash(id_str)) % (10 ** 9)
+    numeric_id = book_id_from_code(id_str)
 
     # Manejar valores NaN
     title = row['TITULO'] if pd.notna(row['TITULO']) else ""
@@ -5,6 +5,7 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 import pandas as pd
 from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.snapshot import book_id_from_code
 from lib_chat_bot.catalog.search_engine import score_book
 from lib_chat_bot.catalog.intent_detector import detect_query_intent
 
@@ -19,7 +20,7 @@ print(f"Libros de García Márquez en la BD: {len(gm_df)}\n")
 books_data = []
 for idx, row in gm_df.iterrows():
     id_str = str(row['Cod. Item'])
-    numeric_id = abs(hash(id_str)) % (10 ** 9)
+    numeric_id = book_id_from_code(id_str)
     title = row['TITULO'] if pd.notna(row['TITULO']) else ''
     author = row['AUTOR'] if pd.notna(row['AUTOR']) else None
     publisher = row['EDITORIAL'] if pd.notna(row['EDITORIAL']) else None
@@ -0,0 +1,97 @@
+import pytest
+
+from lib_chat_bot.catalog import client
+from lib_chat_bot.catalog.availability import AvailabilityOverlay, get_overlay, use_overlay
+from lib_chat_bot.catalog.batch_scoring import score_books_batch
+from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.search_engine import build_query_context, score_book
+
+
+@pytest.fixture
+def overlay():
+    previous = get_overlay()
+    fresh = AvailabilityOverlay(ttl=60)
+    use_overlay(fresh)
+    yield fresh
+    use_overlay(previous)
+
+
+@pytest.fixture
+def fake_api(monkeypatch, overlay):
+    """API con stock mutable; registra las sondas"""
+    state = {"stock": 3, "calls": [], "missing": False}
+
+    def fake_call_api(query, limit=20):
+        state["calls"].append((query, limit))
+        if query in ("brida", "9788408045175") and not state["missing"]:
+            return [Book(id=21, title="BRIDA", author="Paulo Coelho", isbn="9788408045175", stock=state["stock"], price=20.0)]
+        return []
+
+    monkeypatch.setattr(client, "_call_api", fake_call_api)
+    client._search_cache.clear()
+    client._negative_cache.clear()
+    client._probe_cache.clear()
+    yield state
+    client._search_cache.clear()
+    client._negative_cache.clear()
+    client._probe_cache.clear()
+
+
+def test_overlay_overrides_stock_and_price(overlay):
+    book = Book(id=1, title="BRIDA", stock=0, price=10.0)
+    assert overlay.stale([book]) == [book]
+    assert overlay.apply([book]) == [book]
+
+    overlay.update([Book(id=1, title="BRIDA", stock=4, price=12.0)])
+    [fresh] = overlay.apply([book])
+    assert (fresh.title, fresh.stock, fresh.price) == ("BRIDA", 4, 12.0)
+    assert overlay.stale([book]) == []
+
+
+def test_stock_bonus_reads_overlay(overlay):
+    book = Book(id=1, title="BRIDA", author="Paulo Coelho", stock=0)
+    without_stock = score_book(book, "brida")
+
+    overlay.update([book.model_copy(update={"stock": 10})])
+    assert score_book(book, "brida") == without_stock + 15
+    assert score_books_batch([book], build_query_context("brida")).tolist() == [without_stock + 15]
+
+
+def test_cached_metadata_gets_fresh_stock_for_shown_books(fake_api, overlay):
+    [book] = client.search_books("brida")
+    assert book.stock == 3
+    assert fake_api["calls"] == [("brida", 20)]
+
+    # Metadatos y stock frescos: ninguna llamada
+    fake_api["stock"] = 0
+    fake_api["calls"].clear()
+    [book] = client.search_books("brida")
+    assert book.stock == 3
+    assert fake_api["calls"] == []
+
+    # Vence el stock (TTL corto): solo se refresca la disponibilidad, por ISBN
+    overlay.clear()
+    [book] = client.search_books("brida")
+    assert (book.title, book.stock) == ("BRIDA", 0)
+    assert fake_api["calls"] == [("9788408045175", client.AVAILABILITY_PROBE_LIMIT)]
+
+    # Con shown=0 no se refresca nada
+    overlay.clear()
+    fake_api["calls"].clear()
+    client.search_books("brida", shown=0)
+    assert fake_api["calls"] == []
+
+
+def test_refresh_miss_is_not_retried_within_ttl(fake_api, overlay):
+    client.search_books("brida")
+
+    # Vence el stock y la sonda de refresco no devuelve el libro
+    overlay.clear()
+    fake_api["missing"] = True
+    fake_api["calls"].clear()
+    for _ in range(5):
+        [book] = client.search_books("brida")
+        assert book.stock == 3
+
+    # Un solo intento de refresco; los demás aciertos de caché no tocan la red
+    assert fake_api["calls"] == [("9788408045175", client.AVAILABILITY_PROBE_LIMIT)]
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from lib_chat_bot.catalog import client
+from lib_chat_bot.catalog.availability import AvailabilityOverlay, get_overlay, use_overlay
+from lib_chat_bot.catalog.backends import CatalogBackend, HybridBackend, LocalIndexBackend, RemoteApiBackend
+from lib_chat_bot.catalog.index import CatalogIndex
+from lib_chat_bot.catalog.models import Book
+
+
+BOOKS = [
+    Book(id=1, title="HARRY POTTER Y LA PIEDRA FILOSOFAL", author="Rowling, J. K.", stock=2, price=30.0),
+    Book(id=2, title="HARRY POTTER Y LA CAMARA SECRETA", author="Rowling, J. K.", stock=0),
+    Book(id=3, title="EL ALQUIMISTA", author="Paulo Coelho", isbn="978-84-08-04517-5", stock=1),
+    Book(id=4, title="GESTION AMBIENTAL EN LA EMPRESA", publisher="Ecoe"),
+]
+
+
+class FakeRemote:
+    def __init__(self, books):
+        self.books = books
+        self.calls = []
+
+    def search(self, query, limit=20):
+        self.calls.append(query)
+        return list(self.books)[:limit]
+
+    async def search_async(self, query, limit=20):
+        return self.search(query, limit)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """API de disponibilidad en memoria (por ISBN o título); registra las sondas"""
+    previous = get_overlay()
+    use_overlay(AvailabilityOverlay(ttl=60))
+    state = {"books": {}, "calls": []}
+
+    def fake_call_api(query, limit=20):
+        state["calls"].append(query)
+        return list(state["books"].get(query, []))[:limit]
+
+    async def fake_call_api_async(query, limit=20):
+        return fake_call_api(query, limit)
+
+    monkeypatch.setattr(client, "_call_api", fake_call_api)
+    monkeypatch.setattr(client, "_call_api_async", fake_call_api_async)
+    yield state
+    client._probe_cache.clear()
+    client._negative_cache.clear()
+    use_overlay(previous)
+
+
+def test_backends_implement_protocol():
+    local = LocalIndexBackend(CatalogIndex(BOOKS))
+    assert isinstance(local, CatalogBackend)
+    assert isinstance(RemoteApiBackend(), CatalogBackend)
+    assert isinstance(HybridBackend(local, FakeRemote([])), CatalogBackend)
+
+
+def test_local_backend_searches_index_and_reranks():
+    local = LocalIndexBackend(CatalogIndex(BOOKS))
+
+    assert [b.id for b in local.search("piedra filosofal")] == [1]
+    assert sorted(b.id for b in local.search("harry potter")) == [1, 2]
+    assert [b.id for b in local.search("el alqimsta")] == [3]
+    assert [b.id for b in local.search("8408045172")] == [3]
+    assert local.search("zzzz") == []
+
+
+def test_hybrid_goes_remote_only_on_local_miss(fake_api):
+    remote = FakeRemote([Book(id=99, title="LIBRO SOLO EN LA API")])
+    hybrid = HybridBackend(LocalIndexBackend(CatalogIndex(BOOKS)), remote)
+
+    assert [b.id for b in hybrid.search("gestion ambiental")] == [4]
+    assert remote.calls == []
+
+    assert [b.id for b in hybrid.search("zzzz")] == [99]
+    assert remote.calls == ["zzzz"]
+
+
+def test_hybrid_refreshes_availability_of_shown_books(fake_api):
+    # La API tiene otro id para el mismo libro: se empareja por ISBN
+    fake_api["books"]["9788408045175"] = [
+        Book(id=5001, title="EL ALQUIMISTA", isbn="9788408045175", stock=7, price=12.5)
+    ]
+    hybrid = HybridBackend(LocalIndexBackend(CatalogIndex(BOOKS)), FakeRemote([]))
+
+    [book] = hybrid.search("alquimista")
+    assert (book.id, book.author, book.stock, book.price) == (3, "Paulo Coelho", 7, 12.5)
+    assert fake_api["calls"] == ["9788408045175"]
+
+    # Con el dato fresco en el overlay no se vuelve a consultar
+    [book] = asyncio.run(hybrid.search_async("alquimista"))
+    assert book.stock == 7
+    assert fake_api["calls"] == ["9788408045175"]
+
+    # shown=0: sin refresco
+    fake_api["calls"].clear()
+    get_overlay().clear()
+    HybridBackend(LocalIndexBackend(CatalogIndex(BOOKS)), FakeRemote([]), shown=0).search("alquimista")
+    assert fake_api["calls"] == []
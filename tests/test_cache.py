@@ -0,0 +1,83 @@
+import time
+
+from lib_chat_bot.catalog.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl=60, clock=clock)
+
+    cache["harry potter:20"] = ["libro"]
+    assert cache.get("harry potter:20") == ["libro"]
+
+    clock.now = 61
+    assert cache.get("harry potter:20") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl=None)
+
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.get("a")  # "a" pasa a ser la más reciente
+    cache["c"] = 3
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_evicts_oldest_entries():
+    cache = TTLCache(max_entries=100, ttl=None, max_bytes=10, sizeof=len)
+
+    cache["a"] = "xxxx"
+    cache["b"] = "yyyy"
+    cache["c"] = "zzzz"
+
+    assert len(cache) == 2
+    assert "a" not in cache
+    assert cache.stats()["bytes"] == 8
+
+
+def test_insert_into_full_cache_does_not_walk_all_entries():
+    cache = TTLCache(max_entries=50_000, ttl=None)
+    for i in range(50_000):
+        cache[i] = i
+
+    # Antes cada inserción recorría las 50k entradas buscando expiradas (~4 ms)
+    start = time.perf_counter()
+    for i in range(50_000, 52_000):
+        cache[i] = i
+    assert time.perf_counter() - start < 0.5
+    assert len(cache) == 50_000
+    assert cache.stats()["evictions"] == 2_000
+
+
+def test_expired_entries_go_before_live_ones():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=3, ttl=60, clock=clock)
+
+    cache["a"] = 1
+    cache.set("b", 2, ttl=10)
+    cache["c"] = 3
+    cache.get("a")  # "a" es la más reciente; "b" no está en la cabeza LRU
+
+    clock.now = 11
+    cache["d"] = 4
+
+    # "b" venció: sale por el barrido en lugar de desalojar a "c"
+    assert "c" in cache and "a" in cache and "b" not in cache
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["evictions"] == 0
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from lib_chat_bot.catalog import client
+from lib_chat_bot.catalog.models import Book
+
+
+CATALOG = {
+    "piedra filosofal 1": [
+        Book(id=1, title="HARRY POTTER Y LA PIEDRA FILOSOFAL 1", author="J K ROWLING"),
+    ],
+    "gestion ambiental en la empresa": [
+        Book(id=10, title="GESTION DE LA COMPETITIVIDAD EMPRESARIAL"),
+        Book(id=11, title="GESTION AMBIENTAL EN LA EMPRESA"),
+    ],
+    "9788408045175": [
+        Book(id=20, title="BRIDA", isbn="9788408045176"),
+        Book(id=21, title="EL ALQUIMISTA", isbn="9788408045175"),
+    ],
+    # Libro cargado solo con su ISBN-10
+    "8489771960": [
+        Book(id=30, title="MOMO", isbn="8489771960"),
+    ],
+}
+
+
+def _clear_caches():
+    client._search_cache.clear()
+    client._negative_cache.clear()
+    client._probe_cache.clear()
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Reemplaza la API por un catálogo en memoria y registra las sondas."""
+    calls = []
+
+    def fake_call_api(query, limit=20):
+        calls.append((query, limit))
+        return list(CATALOG.get(query, []))[:limit]
+
+    async def fake_call_api_async(query, limit=20):
+        return fake_call_api(query, limit)
+
+    monkeypatch.setattr(client, "_call_api", fake_call_api)
+    monkeypatch.setattr(client, "_call_api_async", fake_call_api_async)
+    _clear_caches()
+    yield calls
+    _clear_caches()
+
+
+def test_ladder_falls_back_to_typo_correction(fake_api):
+    books = client.search_books("gestion anbiental en la enpresa")
+
+    assert fake_api == [
+        ("gestion anbiental en la enpresa", 20),
+        ("gestion ambiental en la empresa", 20),
+    ]
+    assert books[0].title == "GESTION AMBIENTAL EN LA EMPRESA"
+
+
+def test_isbn_query_probes_both_isbn_forms(fake_api):
+    # ISBN-10 con guiones: se busca tal cual y como ISBN-13 a la vez, sin fallback
+    books = client.search_books("84-08-04517-2")
+    assert fake_api == [("8408045172", 20), ("9788408045175", 20)]
+    assert [b.id for b in books] == [21, 20]
+
+    # El mismo libro como ISBN-13 reutiliza las mismas sondas
+    fake_api.clear()
+    books = client.search_books("978-84-08-04517-5")
+    assert fake_api == []
+    assert [b.id for b in books] == [21, 20]
+
+
+def test_isbn_stored_only_as_isbn10_is_found(fake_api):
+    assert [b.id for b in client.search_books("8489771960")] == [30]
+    assert ("9788489771963", 20) in fake_api
+
+    # Escaneado como ISBN-13 también lo encuentra
+    client._search_cache.clear()
+    assert [b.id for b in client.search_books("9788489771963")] == [30]
+
+
+def test_async_search_matches_sync(fake_api):
+    query = "harry potter 1"
+
+    sync_titles = [b.title for b in client.search_books(query)]
+    sync_calls = list(fake_api)
+
+    _clear_caches()
+    fake_api.clear()
+    async_titles = [b.title for b in asyncio.run(client.search_books_async(query))]
+
+    assert async_titles == sync_titles
+    assert fake_api == sync_calls
+
+
+def test_alias_probes_are_sent_concurrently(monkeypatch):
+    aliases = client.TITLE_ALIASES["harry potter y la piedra filosofal"]
+    barrier = threading.Barrier(len(aliases), timeout=5)
+
+    def fake_call_api(query, limit=20):
+        # Solo pasa si todas las sondas de alias están en vuelo a la vez
+        barrier.wait()
+        return [Book(id=aliases.index(query) * 10 + i, title=f"{query} {i}") for i in range(2)]
+
+    monkeypatch.setattr(client, "_call_api", fake_call_api)
+    _clear_caches()
+    try:
+        books = client.search_books("harry potter y la piedra filosofal")
+    finally:
+        _clear_caches()
+
+    assert sorted(b.id for b in books) == [0, 1, 10, 11, 20, 21]
+
+
+def test_speculative_ladder_matches_sequential(fake_api):
+    query = "gestion anbiental en la enpresa"
+
+    sequential = [b.id for b in client.search_books(query)]
+
+    _clear_caches()
+    speculative = [b.id for b in client.search_books(query, speculative=True, budget=3)]
+
+    _clear_caches()
+    speculative_async = [
+        b.id for b in asyncio.run(client.search_books_async(query, speculative=True, budget=3))
+    ]
+
+    assert speculative == sequential
+    assert speculative_async == sequential
+    # La etapa ganadora (corrección de typos) se lanzó junto con la directa
+    assert ("gestion ambiental en la empresa", 20) in fake_api
+
+
+def test_speculative_cache_hit_does_not_build_fallback_plan(fake_api, monkeypatch):
+    query = "gestion anbiental en la enpresa"
+    first = [b.id for b in client.search_books(query, speculative=True)]
+
+    def no_plan(*args):
+        raise AssertionError("un acierto de caché no debe armar el plan de fallback")
+
+    monkeypatch.setattr(client, "_fallback_plan", no_plan)
+    assert [b.id for b in client.search_books(query, speculative=True)] == first
+    assert [b.id for b in asyncio.run(client.search_books_async(query, speculative=True))] == first
+
+
+def test_cache_hit_returns_ranked_result_for_equivalent_query(fake_api):
+    first = client.search_books("GESTION AMBIENTAL EN LA EMPRESA")
+    calls_after_first = len(fake_api)
+
+    again = client.search_books("Gestión ambiental, en la empresa ")
+
+    assert len(fake_api) == calls_after_first
+    assert [b.id for b in again] == [b.id for b in first]
+    assert again[0].title == "GESTION AMBIENTAL EN LA EMPRESA"
+
+
+def test_exhausted_query_and_empty_probes_are_negatively_cached(fake_api):
+    assert client.search_books("libro inexistente xyz") == []
+    first_calls = len(fake_api)
+    assert first_calls > 0
+
+    # Reintento idéntico: ninguna llamada a la API
+    assert client.search_books("libro inexistente xyz") == []
+    assert len(fake_api) == first_calls
+
+    # Reformulación: las sondas ya conocidas como vacías se saltan
+    fake_api.clear()
+    client.search_books("inexistente")
+    assert ("inexistente", 20) not in fake_api
+
+
+def test_probe_results_are_shared_between_user_queries(fake_api):
+    client.search_books("gestion anbiental en la enpresa")
+    fake_api.clear()
+
+    # Su sonda directa es la misma que la sonda corregida de la query anterior
+    books = client.search_books("gestion ambiental en la empresa")
+
+    assert fake_api == []
+    assert books[0].title == "GESTION AMBIENTAL EN LA EMPRESA"
+
+
+def test_concurrent_identical_searches_make_one_request(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def slow_call_api(query, limit=20):
+        calls.append(query)
+        release.wait(timeout=5)
+        return list(CATALOG.get(query, []))
+
+    monkeypatch.setattr(client, "_call_api", slow_call_api)
+    _clear_caches()
+    coalesced_before = client._search_flight.coalesced
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.search_books("gestion ambiental en la empresa")))
+        for _ in range(8)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        while client._search_flight.coalesced < coalesced_before + 7:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        _clear_caches()
+
+    assert calls == ["gestion ambiental en la empresa"]
+    assert len(results) == 8
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import httpx
+
+from lib_chat_bot.catalog import client, http_client
+
+
+def _mock_transport(calls: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        search = request.url.params.get_list("search")[-1]
+        return httpx.Response(
+            200,
+            json={"results": [{"id": 1, "title": search.upper(), "desc2": "Autor", "stock": 2}]},
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_call_api_reuses_shared_client():
+    calls = []
+    http_client.configure_client(transport=_mock_transport(calls))
+    try:
+        shared = http_client.get_client()
+
+        books = client._call_api("el alquimista", 5)
+        client._call_api("harry potter", 5)
+
+        assert http_client.get_client() is shared
+        assert len(calls) == 2
+        assert calls[0].url.params["limit"] == "5"
+        assert books[0].title == "EL ALQUIMISTA"
+        assert books[0].author == "Autor"
+    finally:
+        http_client.configure_client(transport=None)
+
+
+def test_close_client_releases_pool():
+    http_client.configure_client(transport=_mock_transport([]))
+    try:
+        first = http_client.get_client()
+        http_client.close_client()
+
+        assert first.is_closed
+        assert http_client.get_client() is not first
+    finally:
+        http_client.configure_client(transport=None)
+
+
+def test_async_client_per_event_loop_is_closed_with_its_loop():
+    http_client.configure_client(async_transport=httpx.AsyncBaseTransport())
+    try:
+        async def grab():
+            shared = http_client.get_async_client()
+            assert http_client.get_async_client() is shared
+            return shared
+
+        first = asyncio.run(grab())
+        second = asyncio.run(grab())
+
+        # Cada `asyncio.run` tiene su propio cliente y al terminar lo cierra
+        assert first is not second
+        assert first.is_closed and second.is_closed
+
+        # Dos hilos con su propio loop no se pisan el cliente
+        clients = {}
+
+        def worker(name):
+            async def run():
+                clients[name] = [http_client.get_async_client() for _ in range(3)]
+
+            asyncio.run(run())
+
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(map(id, clients["a"]))) == len(set(map(id, clients["b"]))) == 1
+        assert clients["a"][0] is not clients["b"][0]
+    finally:
+        http_client.configure_client(transport=None)
+
+
+def test_aclose_async_client_closes_current_loop_client():
+    async def run():
+        shared = http_client.get_async_client()
+        await http_client.aclose_async_client()
+        assert shared.is_closed
+        assert http_client.get_async_client() is not shared
+
+    asyncio.run(run())
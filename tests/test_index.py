@@ -0,0 +1,84 @@
+from lib_chat_bot.catalog.index import CatalogIndex
+from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.search_engine import _book_features_cache
+
+
+BOOKS = [
+    Book(id=1, title="HARRY POTTER Y LA PIEDRA FILOSOFAL", author="Rowling, J. K.", publisher="Salamandra"),
+    Book(id=2, title="HARRY POTTER Y LA CAMARA SECRETA", author="Rowling, J. K.", isbn="978-84-7888-"),
+    Book(id=3, title="EL ALQUIMISTA", author="Paulo Coelho", isbn="978-84-08-04517-5"),
+    Book(id=4, title="Cien Años de Soledad", author="Gabriel García Márquez"),
+]
+
+
+def test_postings_and_intersections():
+    index = CatalogIndex(BOOKS)
+
+    assert index.postings("title", "potter") == [0, 1]
+    assert index.postings("title", "anos") == [3]
+    assert index.match_all("title", ["harry", "piedra"]) == [0]
+    assert index.match_all("title", ["harry", "alquimista"]) == []
+    assert index.match_any("author", ["coelho", "marquez"]) == [2, 3]
+    assert index.postings("publisher", "salamandra") == [0]
+
+
+def test_building_the_index_leaves_scoring_feature_cache_alone():
+    _book_features_cache.clear()
+    index = CatalogIndex(BOOKS)
+
+    assert len(_book_features_cache) == 0
+    assert index.postings("author", "rowling") == [0, 1]
+
+
+def test_substring_fuzzy_and_isbn_lookups():
+    index = CatalogIndex(BOOKS)
+
+    assert index.substring_candidates(("title",), "quimis") == [2]
+    assert index.substring_candidates(("title", "author"), "Márq") == [3]
+    assert index.fuzzy_candidates("title", ["alqimsta"], threshold=70) == [2]
+    assert index.fuzzy_candidates("author", ["rowlin", "coelo"], threshold=75) == [0, 1, 2]
+    assert index.books_at(index.find_isbn("9788408045175"))[0].id == 3
+    assert index.find_isbn("0000000000") == []
+    # ISBN-10 (con guiones) del mismo libro -> se busca por su ISBN-13
+    assert index.find_isbn("84-08-04517-2") == [2]
+
+
+def test_ngram_index_ranks_typo_candidates():
+    from lib_chat_bot.catalog.index import NGramIndex
+
+    ngrams = NGramIndex(["harry", "potter", "poster", "alquimista", "soledad"])
+
+    assert [token for token, _ in ngrams.similar("poter")] == ["potter", "poster"]
+    assert ngrams.similar("alqimsta")[0][0] == "alquimista"
+    assert ngrams.similar("xyz") == []
+
+    index = CatalogIndex(BOOKS)
+    ranked = index.ngram_candidates("title", ["jarry", "poter", "piedra"])
+    assert [pos for pos, _ in ranked] == [0, 1]
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_author_matching_runs_once_per_distinct_author():
+    from lib_chat_bot.catalog.search_engine import fuzzy_score_author_words, get_book_features, normalize, significant_words
+
+    books = BOOKS + [
+        Book(id=5, title="El Otoño del Patriarca", author="Gabriel García Márquez"),
+        Book(id=6, title="Once minutos", author="Paulo Coelho"),
+        Book(id=7, title="Veronika decide morir", author="COELHO, PAULO"),
+    ]
+    index = CatalogIndex(books)
+
+    assert len(index.authors()) == 4
+    assert index.author_postings("gabriel garcia marquez") == [3, 4]
+
+    for query in ["Paulo Coelho", "gabriel garsia marqes", "rowlin", "coelo paulina", "zzz"]:
+        words = significant_words(normalize(query))
+        expected = []
+        for threshold in (75, 60):
+            expected = [
+                pos for pos, book in enumerate(books)
+                if fuzzy_score_author_words(words, get_book_features(book).author_words, threshold=threshold) >= threshold
+            ]
+            if expected:
+                break
+        assert index.match_authors(words, threshold=75, retry_threshold=60) == expected
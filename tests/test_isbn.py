@@ -0,0 +1,24 @@
+from lib_chat_bot.catalog.intent_detector import detect_query_intent
+from lib_chat_bot.catalog.isbn import canonical_isbn, isbn10_to_13, isbn13_to_10, isbn_forms
+
+
+def test_isbn_conversion_round_trip():
+    assert isbn10_to_13("0-306-40615-2") == "9780306406157"
+    assert isbn13_to_10("978-0-306-40615-7") == "0306406152"
+    assert isbn13_to_10("9791090636071") == ""
+    assert isbn13_to_10("9780804429573") == "080442957X"
+    assert canonical_isbn("080442957x") == "9780804429573"
+    assert canonical_isbn(" L010026 ") == "L010026"
+
+
+def test_isbn_intent_accepts_check_digit_x():
+    assert detect_query_intent("978-84-08-04517-5") == "isbn"
+    assert detect_query_intent("080442957X") == "isbn"
+    assert detect_query_intent("harry potter 1") != "isbn"
+
+
+def test_isbn_forms_include_the_other_length():
+    assert isbn_forms("84-89771-96-0") == ["8489771960", "9788489771963"]
+    assert isbn_forms("978-84-89771-96-3") == ["9788489771963", "8489771960"]
+    assert isbn_forms("9791090636071") == ["9791090636071"]
+    assert isbn_forms("L010026") == ["L010026"]
@@ -29,4 +29,50 @@ def test_fuzzy_title_and_author_with_typos():
         "el alqimsta del autor pablo cuello"
     )
 
-    assert ranked[0].title == "EL ALQUIMISTA"
\ No newline at end of file
+    assert ranked[0].title == "EL ALQUIMISTA"
+
+def test_query_context_scoring_matches_score_book():
+    from lib_chat_bot.catalog.search_engine import build_query_context, score_book_with_context
+
+    books = [
+        Book(id=1, title="HARRY POTTER Y LA PIEDRA FILOSOFAL 1", author="J K Rowling", stock=3),
+        Book(id=2, title="JARRIPOTER 1"),
+        Book(id=3, title="EL ALQUIMISTA", author="Paulo Coelho", category="Novela"),
+    ]
+
+    for query in ["jarry poter 1", "Paulo Coelho", "el alqimsta del autor pablo cuello"]:
+        ctx = build_query_context(query)
+        assert [score_book_with_context(b, ctx) for b in books] == [score_book(b, query) for b in books]
+
+
+def test_book_features_are_cached_by_id_and_content():
+    from lib_chat_bot.catalog.search_engine import get_book_features
+
+    book = Book(id=77, title="Cien Años de Soledad 2.", author="García Márquez", isbn="978-84-376-0494-7")
+    features = get_book_features(book)
+
+    assert features is get_book_features(book.model_copy())
+    assert features.title == "cien anos de soledad 2 "
+    assert features.author_words == ["garcia", "marquez"]
+    assert features.series_number == 2
+    assert features.isbn_clean == "9788437604947"
+
+    renamed = book.model_copy(update={"title": "El Otoño del Patriarca"})
+    assert get_book_features(renamed).title == "el otono del patriarca"
+
+
+def test_batch_scoring_matches_score_book():
+    from lib_chat_bot.catalog.search_engine import build_query_context
+    from lib_chat_bot.catalog.batch_scoring import score_books_batch
+
+    books = [
+        Book(id=1, title="HARRY POTTER Y LA PIEDRA FILOSOFAL 1", author="J K Rowling", stock=3),
+        Book(id=2, title="JARRIPOTER 1"),
+        Book(id=3, title="EL ALQUIMISTA", author="Paulo Coelho", category="Novela"),
+        Book(id=4, title="BRIDA", author="Coelho, Paulo", isbn="9788408045175"),
+        Book(id=5, title="", author=""),
+    ]
+
+    for query in ["jarry poter 1", "Paulo Coelho", "el alqimsta del autor pablo cuello", "9788408045175", "novela"]:
+        ctx = build_query_context(query)
+        assert score_books_batch(books, ctx).tolist() == [score_book(b, query) for b in books]
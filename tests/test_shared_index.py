@@ -0,0 +1,57 @@
+import pandas as pd
+
+from lib_chat_bot.catalog import shared_index
+from lib_chat_bot.catalog.index import CatalogIndex
+from lib_chat_bot.catalog.models import Book
+
+
+BOOKS = [
+    Book(id=1, title="HARRY POTTER Y LA PIEDRA FILOSOFAL", author="Rowling, J. K.", publisher="Salamandra", stock=4, price=25.5),
+    Book(id=2, title="HARRY POTTER Y LA CAMARA SECRETA", author="Rowling, J. K.", isbn="978-84-7888-"),
+    Book(id=3, title="EL ALQUIMISTA", author="Paulo Coelho", isbn="978-84-08-04517-5", stock=0),
+    Book(id=4, title="Cien Años de Soledad", author="Gabriel García Márquez"),
+]
+
+
+def test_shared_index_matches_in_memory_index(tmp_path):
+    index = CatalogIndex(BOOKS)
+    path = tmp_path / "catalogo.index"
+    shared_index.write_shared_index(index, path, source_hash="abc")
+
+    shared, source_hash = shared_index.open_shared_index(path)
+    assert source_hash == "abc"
+    assert [b.model_dump() for b in shared.books] == [b.model_dump() for b in BOOKS]
+
+    assert shared.postings("title", "potter") == index.postings("title", "potter") == [0, 1]
+    assert shared.postings("title", "inexistente") == []
+    assert shared.match_all("title", ["harry", "piedra"]) == [0]
+    assert shared.substring_candidates(("title", "author"), "Márq") == [3]
+    assert shared.find_isbn("8408045172") == index.find_isbn("8408045172") == [2]
+    assert shared.match_authors(["garcia", "marquez"]) == index.match_authors(["garcia", "marquez"]) == [3]
+    assert shared.match_authors(["rowlin"], 75) == [0, 1]
+    assert shared.ngram_candidates("title", ["poter"]) == index.ngram_candidates("title", ["poter"])
+    assert sorted(shared.vocabulary("author")) == sorted(index.vocabulary("author"))
+    assert shared.books.code_of("Paulo Coelho") == index.books.code_of("Paulo Coelho")
+
+
+def test_load_shared_index_rebuilds_only_when_source_changes(tmp_path, monkeypatch):
+    source = tmp_path / "catalogo.xlsx"
+    columns = ["Cod. Item", "TITULO", "AUTOR", "EDITORIAL", "ISBN", "Existencia"]
+    pd.DataFrame([["A1", "EL ALQUIMISTA", "Paulo Coelho", None, "9788408045175", 2]], columns=columns).to_excel(source, index=False)
+
+    index = shared_index.load_shared_index(source)
+    assert shared_index.default_shared_index_path(source).exists()
+    assert [b.title for b in index.books_at(index.postings("title", "alquimista"))] == ["EL ALQUIMISTA"]
+
+    # Con el índice al día no se vuelve a indexar
+    def fail(_):
+        raise AssertionError("no debería reconstruir el índice")
+
+    monkeypatch.setattr(shared_index, "load_catalog_store", fail)
+    assert len(shared_index.load_shared_index(source)) == 1
+
+    monkeypatch.undo()
+    pd.DataFrame([["A1", "BRIDA", "Paulo Coelho", None, None, 1]], columns=columns).to_excel(source, index=False)
+    index = shared_index.load_shared_index(source)
+    assert index.postings("title", "brida") == [0]
+    assert index.postings("title", "alquimista") == []
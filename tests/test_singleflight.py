@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+from lib_chat_bot.catalog.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_search(query):
+        calls.append(query)
+        release.wait(timeout=5)
+        return [query.upper()]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("harry potter 1", slow_search, "harry potter 1")))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    while flight.coalesced < 9:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["harry potter 1"]
+    assert results == [["HARRY POTTER 1"]] * 10
+
+
+def test_async_callers_share_one_call_and_survive_cancellation():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow_search(query):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        return [query.upper()]
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.do("harry potter 1", slow_search, "harry potter 1")) for _ in range(5)]
+        await asyncio.sleep(0)
+        # Cancelar al primer llamador no debe afectar a los demás
+        callers[0].cancel()
+        return await asyncio.gather(*callers[1:])
+
+    results = asyncio.run(main())
+
+    assert calls == ["harry potter 1"]
+    assert results == [["HARRY POTTER 1"]] * 4
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from lib_chat_bot.catalog import snapshot
+from lib_chat_bot.catalog.models import Book
+
+
+def _write_excel(path, rows):
+    columns = ["Cod. Item", "TITULO", "AUTOR", "EDITORIAL", "ISBN", "Existencia"]
+    pd.DataFrame(rows, columns=columns).to_excel(path, index=False)
+
+
+def test_snapshot_round_trip(tmp_path):
+    books = [
+        Book(id=1, title="EL ALQUIMISTA", author="Paulo Coelho", isbn="9788408045175", stock=3),
+        Book(id=2, title="BRIDA", author="Paulo Coelho", publisher="Planeta", stock=0),
+    ]
+    path = tmp_path / "catalogo.snapshot"
+    snapshot.write_snapshot(books, path, source_hash="abc")
+
+    loaded, source_hash = snapshot.read_snapshot(path)
+    assert source_hash == "abc"
+    assert [b.model_dump() for b in loaded] == [b.model_dump() for b in books]
+
+
+def test_load_catalog_rebuilds_only_when_source_changes(tmp_path, monkeypatch):
+    source = tmp_path / "catalogo.xlsx"
+    _write_excel(source, [["A1", "EL ALQUIMISTA", "Paulo Coelho", None, "9788408045175", 2], ["A2", None, None, None, "L010026", 1]])
+
+    books = snapshot.load_catalog(source)
+    assert [(b.title, b.author, b.isbn, b.stock) for b in books] == [("EL ALQUIMISTA", "Paulo Coelho", "9788408045175", 2)]
+    assert snapshot.default_snapshot_path(source).exists()
+
+    # Con el snapshot al día no se vuelve a leer el Excel
+    def fail(_):
+        raise AssertionError("no debería leer la planilla")
+
+    monkeypatch.setattr(snapshot, "read_catalog_excel", fail)
+    assert [b.model_dump() for b in snapshot.load_catalog(source)] == [b.model_dump() for b in books]
+
+    monkeypatch.undo()
+    _write_excel(source, [["A1", "BRIDA", "Paulo Coelho", "Planeta", None, 0]])
+    assert [b.title for b in snapshot.load_catalog(source)] == ["BRIDA"]
+
+
+def test_book_ids_are_stable_and_distinct():
+    assert snapshot.book_id_from_code("L010006") == 120010006
+    assert snapshot.book_id_from_code("P010028") == 160010028
+    assert snapshot.book_id_from_code("l013222") == 380013222
+    assert snapshot.book_id_from_code(" L010006 ") == 120010006
+
+    # Códigos con otro formato: hash estable, fuera del rango de los códigos parseados
+    hashed = snapshot.book_id_from_code("COL-77/A")
+    assert hashed == snapshot.book_id_from_code("COL-77/A") >= 10 ** 9
+    assert hashed != snapshot.book_id_from_code("COL-77/B")
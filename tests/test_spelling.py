@@ -0,0 +1,63 @@
+from Levenshtein import distance
+
+from lib_chat_bot.catalog import fallback
+from lib_chat_bot.catalog.index import CatalogIndex
+from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.spelling import SymSpell
+
+
+def test_lookup_finds_every_term_within_distance():
+    vocab = {"ambiental": 120, "ambiente": 40, "potter": 14, "poster": 2, "poder": 30, "alquimista": 5, "ab": 1}
+    speller = SymSpell.from_frequencies(vocab)
+
+    for word in ["anbiental", "poter", "alqimsta", "alquimistas", "b", "zzz"]:
+        expected = {term for term in vocab if distance(word, term) <= 2}
+        assert {term for term, _, _ in speller.lookup(word)} == expected
+
+    assert speller.lookup("poter")[0] == ("poder", 1, 30)
+    assert speller.lookup("poter", max_distance=0) == []
+
+
+def test_catalog_vocabulary_corrects_query_typos():
+    books = [
+        Book(id=1, title="Cien Años de Soledad", author="Gabriel García Márquez"),
+        Book(id=2, title="Harry Potter y la piedra filosofal", author="J. K. Rowling"),
+        Book(id=3, title="El poder del ahora"),
+    ]
+    assert fallback.correct_query_typos("cien anos de soleda") == "cien anos de soleda"
+
+    try:
+        corrector = fallback.use_catalog_vocabulary(CatalogIndex(books))
+        assert "soledad" in corrector and "ambiental" in corrector
+
+        assert fallback.correct_query_typos("cien anos de soleda") == "cien anos de soledad"
+        # A igual distancia se prefiere la palabra más larga ("potter" sobre "poder")
+        assert fallback.correct_query_typos("jarry poter 1") == "harry potter 1"
+        assert fallback.correct_query_typos("gestion anbiental") == "gestion ambiental"
+    finally:
+        fallback.set_typo_corrector(None)
+
+
+def test_typo_corrector_is_built_at_warm_up_not_on_first_query(tmp_path, monkeypatch):
+    from lib_chat_bot.catalog import backends
+    from lib_chat_bot.catalog.shared_index import write_shared_index
+
+    books = [Book(id=1, title="MANUAL DE ASTRONOMIA"), Book(id=2, title="PERIODISMO NARRATIVO")]
+    path = tmp_path / "catalogo.index"
+    write_shared_index(CatalogIndex(books), path)
+
+    monkeypatch.setattr(fallback, "CATALOG_INDEX_PATH", str(path))
+    monkeypatch.setattr(fallback, "_typo_corrector", None)
+    monkeypatch.setattr(backends, "_backend", backends.RemoteApiBackend())
+
+    # Sin warm-up la búsqueda no arma el corrector (queda COMMON_WORDS)
+    assert fallback.correct_query_typos("astronomya periodizmo") == "astronomya periodizmo"
+    assert fallback.get_typo_corrector() is None
+
+    # Palabras que no están en COMMON_WORDS: solo las corrige el vocabulario del catálogo
+    backends.warm_up()
+    assert fallback.correct_query_typos("astronomya periodizmo") == "astronomia periodismo"
+
+    monkeypatch.setattr(fallback, "TYPO_VOCABULARY", "common")
+    monkeypatch.setattr(fallback, "_typo_corrector", None)
+    assert fallback.load_typo_corrector() is None
@@ -0,0 +1,73 @@
+from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.sqlite_cache import SQLiteCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_books_are_shared_between_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    books = [Book(id=1, title="EL ALQUIMISTA", author="Paulo Coelho", price=12.5, stock=3)]
+
+    SQLiteCache(path)["el alquimista:title:20"] = books
+    # Otra instancia (ej: otro worker) sobre el mismo archivo
+    other = SQLiteCache(path)
+
+    assert other.get("el alquimista:title:20") == books
+    assert other.stats()["hits"] == 1
+
+
+def test_entries_expire_and_lru_is_evicted(tmp_path):
+    clock = FakeClock()
+    cache = SQLiteCache(tmp_path / "cache.sqlite3", max_entries=2, ttl=60, clock=clock)
+
+    cache["a"] = [Book(id=1, title="A")]
+    clock.now += 10
+    cache["b"] = [Book(id=2, title="B")]
+    clock.now += 10
+    cache.get("a")  # "a" pasa a ser la más reciente
+    clock.now += 10
+    cache["c"] = [Book(id=3, title="C")]
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+    clock.now += 61
+    assert cache.get("c") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_hits_do_not_write_on_every_read(tmp_path):
+    clock = FakeClock()
+    cache = SQLiteCache(tmp_path / "cache.sqlite3", ttl=60, clock=clock)
+    cache["a"] = [Book(id=1, title="A")]
+
+    def accessed_at():
+        return cache._conn().execute("SELECT accessed_at FROM cache").fetchone()[0]
+
+    # Dentro de `touch_interval` (TTL / 10) el acierto no escribe
+    clock.now += 5
+    assert cache.get("a")
+    assert accessed_at() == 1_000.0
+
+    clock.now += 5
+    assert cache.get("a")
+    assert accessed_at() == 1_010.0
+
+
+def test_size_limit_is_checked_every_few_writes(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.sqlite3", max_entries=2, evict_every=3)
+
+    cache["a"] = 1
+    cache["b"] = 2
+    assert len(cache) == 2
+    cache["c"] = 3  # tercera escritura: se recorta al límite
+    assert len(cache) == 2
+    cache["d"] = 4
+    assert len(cache) == 3
@@ -0,0 +1,34 @@
+from lib_chat_bot.catalog.models import Book
+from lib_chat_bot.catalog.store import CatalogStore
+
+
+BOOKS = [
+    Book(id=1, title="EL ALQUIMISTA", author="COELHO, PAULO", publisher="PLANETA", stock=3, price=12.5),
+    Book(id=2, title="BRIDA", author="COELHO, PAULO", publisher="PLANETA", isbn="9788408045175"),
+    Book(id=3, title="CIEN AÑOS DE SOLEDAD", author="GARCIA MARQUEZ, GABRIEL", stock=0, category="Novela"),
+]
+
+
+def test_store_round_trips_books_lazily():
+    store = CatalogStore.from_books(BOOKS)
+
+    assert len(store) == 3
+    assert [b.model_dump() for b in store] == [b.model_dump() for b in BOOKS]
+    assert store[1].model_dump() == BOOKS[1].model_dump()
+    assert store[-1].id == 3
+    assert [b.id for b in store[1:]] == [2, 3]
+    assert store.books([2, 0])[0].title == "CIEN AÑOS DE SOLEDAD"
+
+    restored = CatalogStore.from_columns(store.to_columns())
+    assert [b.model_dump() for b in restored.to_books()] == [b.model_dump() for b in BOOKS]
+
+
+def test_store_interns_repeated_strings():
+    store = CatalogStore.from_books(BOOKS)
+
+    coelho = store.code_of("COELHO, PAULO")
+    assert coelho and store.codes("author").count(coelho) == 2
+    assert store.codes("publisher")[0] == store.codes("publisher")[1]
+    assert store.text("author", 2) == "GARCIA MARQUEZ, GABRIEL"
+    assert store.text("isbn", 0) is None
+    assert store.code_of("NO EXISTE") == 0
@@ -0,0 +1,92 @@
+import httpx
+import pytest
+
+from lib_chat_bot.catalog import http_client, sync
+from lib_chat_bot.catalog.snapshot import read_snapshot, read_snapshot_store
+
+
+def _item(book_id, title, stock=1, price=10.0):
+    return {"id": book_id, "title": title, "desc2": "Autor", "stock": stock, "price": price}
+
+
+@pytest.fixture
+def fake_catalog():
+    """API paginada en memoria; registra los offsets pedidos"""
+    state = {"items": [_item(i, f"LIBRO {i}") for i in range(1, 8)], "offsets": [], "count": True, "max_limit": None}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        if state["max_limit"]:
+            limit = min(limit, state["max_limit"])
+        state["offsets"].append(offset)
+        data = {"results": state["items"][offset:offset + limit]}
+        if state["count"]:
+            data["count"] = len(state["items"])
+        return httpx.Response(200, json=data)
+
+    http_client.configure_client(transport=httpx.MockTransport(handler))
+    yield state
+    http_client.configure_client(transport=None)
+
+
+@pytest.mark.parametrize("with_count", [True, False])
+@pytest.mark.parametrize("page_size, max_limit", [(3, None), (500, 3)])
+def test_fetch_catalog_pages_through_everything(fake_catalog, with_count, page_size, max_limit):
+    # max_limit: la API recorta el `limit` pedido a páginas de 3
+    fake_catalog["count"] = with_count
+    fake_catalog["max_limit"] = max_limit
+
+    books = sync.fetch_catalog(page_size=page_size, workers=2)
+
+    assert [b.id for b in books] == list(range(1, 8))
+    assert sorted(set(fake_catalog["offsets"]))[:3] == [0, 3, 6]
+
+
+def test_incremental_sync_rewrites_only_changed_rows(fake_catalog, tmp_path):
+    path = tmp_path / "espejo.snapshot"
+
+    stats = sync.sync_mirror(path, page_size=3)
+    assert (stats.total, stats.added, stats.updated, stats.removed) == (7, 7, 0, 0)
+
+    # Sin cambios en la API el archivo no se reescribe
+    mtime = path.stat().st_mtime_ns
+    assert not sync.sync_mirror(path, page_size=3).changed
+    assert path.stat().st_mtime_ns == mtime
+
+    # Cambia el stock de uno, se agrega otro y se da de baja el primero
+    items = fake_catalog["items"]
+    items[3] = _item(4, "LIBRO 4", stock=0)
+    items.append(_item(8, "LIBRO 8"))
+    del items[0]
+
+    stats = sync.sync_mirror(path, page_size=3)
+    assert (stats.total, stats.added, stats.updated, stats.removed) == (7, 1, 1, 1)
+
+    books, _ = read_snapshot(path)
+    assert [b.id for b in books] == [2, 3, 4, 5, 6, 7, 8]
+    assert books[2].stock == 0
+
+
+def test_empty_response_keeps_existing_mirror(fake_catalog, tmp_path):
+    path = tmp_path / "espejo.snapshot"
+    sync.sync_mirror(path)
+
+    fake_catalog["items"] = []
+    with pytest.raises(RuntimeError):
+        sync.sync_mirror(path)
+    assert len(read_snapshot_store(path)[0]) == 7
+
+
+def test_sync_refuses_to_remove_most_of_the_mirror(fake_catalog, tmp_path):
+    path = tmp_path / "espejo.snapshot"
+    sync.sync_mirror(path)
+
+    # Descarga incompleta: solo llega una página
+    fake_catalog["items"] = fake_catalog["items"][:3]
+    with pytest.raises(RuntimeError):
+        sync.sync_mirror(path)
+    assert len(read_snapshot_store(path)[0]) == 7
+
+    # Una reconstrucción completa sí acepta la baja
+    assert sync.sync_mirror(path, full=True).total == 3